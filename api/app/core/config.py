@@ -6,6 +6,12 @@ class Settings(BaseSettings):
     APP_NAME: str = "Bytescribe application"
     DEBUG: bool = False
     ALLOWED_ORIGINS: List[str] = ["*"]
+    SUMMARY_CACHE_TTL: int = 3600
+    # Optional bucket to share cached summaries across Lambda containers
+    SUMMARY_CACHE_BUCKET: str = ""
+    # Mark the image-selection prompt prefix with `cache_control`; only for
+    # Claude models that support Bedrock prompt caching
+    BEDROCK_PROMPT_CACHING: bool = False
 
 
 settings = Settings()
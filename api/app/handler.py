@@ -0,0 +1,96 @@
+"""
+Plain AWS Lambda entry point for the HTTP API.
+
+Dispatches on the request path directly instead of going through
+FastAPI + Mangum, which keeps cold starts and per-request overhead low.
+`app.main` is still the FastAPI app for local development (uvicorn).
+
+API Gateway buffers Lambda responses, so `/bedrock/summary` always returns
+the complete summary here; the streamed variant (`stream=true`) is only
+served by `app.main`.
+"""
+import logging
+import orjson
+
+from app.core.config import settings
+from app.utils.bedrock import bedrock_runtime
+
+# Lambda already installs a handler on the root logger; only set the level
+logging.getLogger().setLevel(logging.DEBUG if settings.DEBUG else logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Build the Bedrock client during Lambda init so warm invocations reuse it
+bedrock_runtime.get_client()
+
+
+def _request_header(event, name):
+    # v2 events lower-case header names, v1 events keep the client's casing
+    for key, value in (event.get("headers") or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _cors_headers(event):
+    """
+    Same CORS headers CORSMiddleware sends in `app.main`: the request Origin
+    is echoed back when allowed, `*` when any origin is.
+    """
+    headers = {
+        "Access-Control-Allow-Headers": "*",
+        "Access-Control-Allow-Methods": "*",
+        "Content-Type": "application/json",
+        "Vary": "Origin",
+    }
+    origin = _request_header(event, "origin")
+    if "*" in settings.ALLOWED_ORIGINS and origin is None:
+        headers["Access-Control-Allow-Origin"] = "*"
+    elif origin and ("*" in settings.ALLOWED_ORIGINS or origin in settings.ALLOWED_ORIGINS):
+        # Credentialed requests can't use `*`, so echo the origin instead
+        headers["Access-Control-Allow-Origin"] = origin
+        headers["Access-Control-Allow-Credentials"] = "true"
+    return headers
+
+
+def _proxy_response(event, status_code: int, payload):
+    return {
+        "statusCode": status_code,
+        "headers": _cors_headers(event),
+        "body": orjson.dumps(payload).decode(),
+    }
+
+
+def _health(event):
+    return _proxy_response(event, 200, {"status": "ok"})
+
+
+def _summaries(event):
+    try:
+        result = bedrock_runtime.summarize_page()
+        return _proxy_response(event, 200, {"result": result.get("result", {})})
+    except Exception as ex:
+        logger.error(f"---> summaries: Meet an exception {ex}")
+        return _proxy_response(event, 500, {"detail": str(ex)})
+
+
+_ROUTES = {
+    ("GET", "/health"): _health,
+    ("POST", "/bedrock/summary"): _summaries,
+}
+
+
+def lambda_handler(event, context=None):
+    """
+    Accepts API Gateway HTTP API (payload v2) and REST API (payload v1) events.
+    """
+    http = event.get("requestContext", {}).get("http", {})
+    method = http.get("method") or event.get("httpMethod", "")
+    path = event.get("rawPath") or event.get("path", "")
+
+    if method == "OPTIONS":
+        return {"statusCode": 200, "headers": _cors_headers(event), "body": ""}
+
+    route = _ROUTES.get((method, path))
+    if route is None:
+        return _proxy_response(event, 404, {"detail": "Not Found"})
+    return route(event)
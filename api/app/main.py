@@ -1,12 +1,20 @@
+import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from mangum import Mangum
+from fastapi.responses import ORJSONResponse
 
 from .core.config import settings
 from .routers import beckrock
+from .utils.bedrock import bedrock_runtime
 
 
-app = FastAPI(title=settings.APP_NAME, debug=settings.DEBUG)
+logging.basicConfig(level=logging.DEBUG if settings.DEBUG else logging.INFO)
+
+app = FastAPI(
+    title=settings.APP_NAME,
+    debug=settings.DEBUG,
+    default_response_class=ORJSONResponse
+)
 
 # CORS (để gọi từ frontend)
 app.add_middleware(
@@ -25,5 +33,5 @@ def health():
 
 app.include_router(beckrock.router)
 
-# Adapter cho AWS Lambda (API Gateway / Function URL)
-handler = Mangum(app)
+# Build the Bedrock client at startup so the first request doesn't pay for it
+bedrock_runtime.get_client()
@@ -1,5 +1,10 @@
 import logging
+from itertools import chain
+
+import orjson
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from typing import List
 from app.models.bedrock import (
     SummaryResponse,
@@ -7,21 +12,64 @@ from app.models.bedrock import (
 )
 from app.utils.bedrock import bedrock_runtime
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/bedrock", tags=["bedrock"])
 
 
+def _sse(data, event=None):
+    # JSON-encoded so newlines in the text can't break the `data:` line
+    head = f"event: {event}\n" if event else ""
+    return f"{head}data: {orjson.dumps(data).decode()}\n\n"
+
+
+def _sse_summary(chunks):
+    """
+    Frame summary text chunks as server-sent events. The response has
+    already started, so a failure mid-stream is sent as an `error` event.
+    """
+    try:
+        for text in chunks:
+            yield _sse({"text": text})
+    except Exception as ex:
+        logger.error(f"---> summaries: Meet an exception {ex}")
+        yield _sse({"detail": str(ex)}, event="error")
+        return
+    yield _sse({}, event="done")
+
+
 @router.post(
     "/summary",
-    response_model=SummaryResponse,
+    # The payload is built by us, so skip re-validating it on the way out
+    response_model=None,
+    responses={
+        200: {
+            "model": SummaryResponse,
+            "description": "The summary as JSON; with `stream=true`, server-sent events instead",
+            "content": {
+                "text/event-stream": {
+                    "example": 'data: {"text":"..."}\n\nevent: done\ndata: {}\n\n'
+                }
+            },
+        }
+    },
     status_code=200
 )
-def summaries():
+async def summaries(stream: bool = False):
     try:
-        result = bedrock_runtime.summarize_page()
-        return SummaryResponse(**result)
+        if stream:
+            chunks = bedrock_runtime.summarize_page_stream()
+            # Pull the first chunk before responding, so a failed model call
+            # still maps to a 500 instead of an empty 200 stream
+            first = await run_in_threadpool(next, chunks, None)
+            if first is not None:
+                chunks = chain((first,), chunks)
+            return StreamingResponse(
+                _sse_summary(chunks),
+                media_type="text/event-stream"
+            )
+        result = await bedrock_runtime.summarize_page_async()
+        return SummaryResponse.model_construct(result=result.get("result", {}))
     except Exception as ex:
         logger.error(f"---> summaries: Meet an exception {ex}")
         raise HTTPException(500, str(ex))
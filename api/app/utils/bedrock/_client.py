@@ -0,0 +1,22 @@
+"""
+Shared boto3 session and clients for every Bedrock/S3 call in the api.
+"""
+import os
+
+import boto3
+from botocore.config import Config
+
+BEDROCK_REGION = os.getenv("BEDROCK_REGION") or os.getenv("REGION", "us-east-1")
+
+# Keep-alive connections and a pool large enough for the concurrent
+# caption/title and embedding calls; one session resolves credentials once.
+BOTO_CONFIG = Config(
+    max_pool_connections=64,
+    retries={"max_attempts": 3, "mode": "adaptive"},
+    connect_timeout=3,
+    read_timeout=60,
+    tcp_keepalive=True,
+)
+session = boto3.Session(region_name=BEDROCK_REGION)
+s3 = session.client("s3", config=BOTO_CONFIG)
+runtime = session.client("bedrock-runtime", config=BOTO_CONFIG)
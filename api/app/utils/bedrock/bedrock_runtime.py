@@ -2,10 +2,17 @@
 """
 Lists the available Amazon Bedrock models.
 """
-import logging
+import asyncio
+import hashlib
 import json
-import boto3
+import logging
+import threading
+import time
+import orjson
 import os
+from collections import OrderedDict
+from types import MappingProxyType
+from functools import lru_cache, partial
 
 
 from botocore.exceptions import ClientError
@@ -14,21 +21,68 @@ from app.constants import (
     BEDROCK_MODEL_ANTHROPIC_CLAUDE35
 )
 from app.core.config import settings
-from .gen_captions import batch_caption_s3_images
+from ._client import (
+    BOTO_CONFIG,
+    runtime as _runtime,
+    s3 as _s3,
+    session as _session
+)
+from .gen_captions import batch_multi_mode_s3_images
+from .prompts import (
+    IMAGE_SELECTION_ARTICLE_OPEN,
+    IMAGE_SELECTION_CLOSE,
+    IMAGE_SELECTION_IMAGES_OPEN,
+    IMAGE_SELECTION_PROMPT_HEAD,
+    SUMMARY_PROMPT
+)
 
 _CAPTION_MODE = "caption"
 _TITLE_MODE = "title"
-_DEFAULT_PROMPT = """
-    Summarize the following text into exactly 3 main bullet points:
-    - Each bullet point must be no longer than 100 words.
-    - Focus only on the core ideas, avoid minor details or repetition.
-    - Return the output as plain text bullets.
-
-    Text:\n
-"""
-logging.basicConfig(level=logging.INFO)
+# Image fields the model may echo back as an image reference
+_META_KEYS = ("s3_url", "presigned_url", "source_url")
+_NO_META = (None, None, ())
 logger = logging.getLogger(__name__)
 
+# Read-only so the shared default can't be mutated by a caller
+_DEFAULT_TEXTGEN_CONFIG = MappingProxyType({
+    "maxTokenCount": 8192,
+    "temperature": 0.7
+})
+# Summary output budget, scaled to the input instead of the model ceiling
+_SUMMARY_MIN_TOKENS = 256
+_SUMMARY_MAX_TOKENS = 2048
+# 3 bullets of JSON with image URLs stay well under this
+_IMAGE_SELECTION_MAX_TOKENS = 1024
+
+# Constant parts of the request bodies, serialized once; per request only the
+# prompt text is encoded and spliced in.
+_TITAN_BODY_SUFFIX = b'}'
+_CLAUDE_BODY_PREFIX = (
+    b'{"anthropic_version":"bedrock-2023-05-31","max_tokens":%d,"temperature":0.2,' % _IMAGE_SELECTION_MAX_TOKENS +
+    b'"messages":[{"role":"user","content":'
+)
+_CLAUDE_BODY_SUFFIX = b'}]}'
+_EPHEMERAL_CACHE = {"type": "ephemeral"}
+
+# Summaries keyed on a hash of the model id and request body, so identical
+# pages (same prompt and config) skip the Bedrock round trip.
+_SUMMARY_CACHE_SIZE = 1024
+_summary_cache = OrderedDict()
+_summary_cache_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Return the shared bedrock-runtime client.
+    """
+    return _runtime
+
+
+@lru_cache(maxsize=1)
+def _bedrock_client():
+    # Control-plane client, only needed by list_foundation_models; built once
+    return _session.client("bedrock", config=BOTO_CONFIG)
+
 
 def list_foundation_models():
     """
@@ -38,14 +92,10 @@ def list_foundation_models():
     """
 
     try:
-        bedrock_client = boto3.client(service_name="bedrock")
-        response = bedrock_client.list_foundation_models()
+        response = _bedrock_client().list_foundation_models()
         fm_models = response["modelSummaries"]
         logger.info("Got %s foundation models.", len(fm_models))
-        for model in fm_models:
-            print(f"Model: {model['modelName']}")
-            print(json.dumps(model, indent=2))
-            print("---------------------------\n")
+        logger.debug("models: %s", [m["modelName"] for m in fm_models])
 
         logger.info("Done.")
         return fm_models
@@ -55,26 +105,88 @@ def list_foundation_models():
         raise
 
 
+def _summary_cache_key(model_id, body):
+    return hashlib.blake2b(model_id.encode() + b"\0" + body, digest_size=16).hexdigest()
+
+
+def _summary_cache_get(key):
+    with _summary_cache_lock:
+        hit = _summary_cache.get(key)
+        if hit and hit[0] > time.monotonic():
+            _summary_cache.move_to_end(key)
+            return hit[1]
+    if not settings.SUMMARY_CACHE_BUCKET:
+        return None
+    try:
+        obj = _s3.get_object(Bucket=settings.SUMMARY_CACHE_BUCKET, Key=f"summaries/{key}.json")
+    except ClientError:
+        return None
+    value = orjson.loads(obj["Body"].read())
+    _summary_cache_put(key, value, persist=False)
+    return value
+
+
+def _summary_cache_put(key, value, persist=True):
+    with _summary_cache_lock:
+        _summary_cache[key] = (time.monotonic() + settings.SUMMARY_CACHE_TTL, value)
+        _summary_cache.move_to_end(key)
+        while len(_summary_cache) > _SUMMARY_CACHE_SIZE:
+            _summary_cache.popitem(last=False)
+    if persist and settings.SUMMARY_CACHE_BUCKET:
+        try:
+            _s3.put_object(
+                Bucket=settings.SUMMARY_CACHE_BUCKET,
+                Key=f"summaries/{key}.json",
+                Body=orjson.dumps(value),
+                ContentType="application/json"
+            )
+        except ClientError as ex:
+            logger.warning(f"Couldn't store cached summary: {str(ex)}")
+
+
+def _summary_max_tokens(content_page):
+    """
+    Output budget for a summary of `content_page`: ~1/8 of its length in
+    characters, rounded up to 256 so only a few body prefixes get cached.
+    """
+    tokens = min(_SUMMARY_MAX_TOKENS, max(_SUMMARY_MIN_TOKENS, len(content_page) // 8))
+    return -(-tokens // 256) * 256
+
+
+@lru_cache(maxsize=8)
+def _titan_body_prefix(max_tokens):
+    config = orjson.dumps({**_DEFAULT_TEXTGEN_CONFIG, "maxTokenCount": max_tokens})
+    return b'{"textGenerationConfig":' + config + b',"inputText":'
+
+
+def _titan_summary_body(content_page, text_config):
+    max_tokens = _summary_max_tokens(content_page)
+    if text_config:
+        return orjson.dumps({
+            "inputText": SUMMARY_PROMPT + content_page,
+            "textGenerationConfig": {
+                **_DEFAULT_TEXTGEN_CONFIG,
+                "maxTokenCount": max_tokens,
+                **text_config
+            }
+        })
+    return _titan_body_prefix(max_tokens) + orjson.dumps(SUMMARY_PROMPT + content_page) + _TITAN_BODY_SUFFIX
+
+
 def summarize_page(
     content_page="",
-    text_config={},
+    text_config=None,
     model_id=BEDROCK_MODEL_AWS_TITANT
 ):
-    _TextGenerationConfig = {
-        "maxTokenCount": 8192,
-        "temperature": 0.7
-    }
+    body = _titan_summary_body(content_page, text_config)
 
-    body = json.dumps({
-        "inputText": _DEFAULT_PROMPT + content_page,
-        "textGenerationConfig": {
-            **_TextGenerationConfig,
-            **text_config
-        }
-    })
+    cache_key = _summary_cache_key(model_id, body)
+    cached = _summary_cache_get(cache_key)
+    if cached is not None:
+        return cached
 
     try:
-        resp = bedrock_client.invoke_model(
+        resp = get_client().invoke_model(
             modelId=model_id,
             body=body,
             contentType="application/json",
@@ -84,21 +196,249 @@ def summarize_page(
         logger.error(f"Couldn't invoke a model: {str(ex)}")
         raise
 
-    output = json.loads(resp["body"].read())
+    output = orjson.loads(resp["body"].read())
     results = output.get("results", [])
+    if results:
+        # Track how much of the output budget is used so the cap can be tuned
+        max_tokens = (text_config or {}).get("maxTokenCount") or _summary_max_tokens(content_page)
+        logger.debug("summary output tokens %s/%s", results[0].get("tokenCount"), max_tokens)
+        if results[0].get("completionReason") == "LENGTH":
+            logger.warning("Summary truncated at %s output tokens", max_tokens)
     # --------------------------------------
     if settings.DEBUG:
-        print(json.dumps(output, indent=4))
+        print(orjson.dumps(output, option=orjson.OPT_INDENT_2).decode())
         for idx, result in enumerate(results):
             print(f"---> Result {idx}:", result.get("outputText", ""))
 
-    return {"result": results[0] if results else {}}
+    summary = {"result": results[0] if results else {}}
+    _summary_cache_put(cache_key, summary)
+    return summary
+
+
+async def summarize_page_async(*args, **kwargs):
+    """
+    Awaitable `summarize_page`: the blocking boto3 call runs in the default
+    executor so the event loop keeps serving other requests.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, partial(summarize_page, *args, **kwargs))
+
+
+def summarize_page_stream(
+    content_page="",
+    text_config=None,
+    model_id=BEDROCK_MODEL_AWS_TITANT
+):
+    """
+    Same as `summarize_page` but yields the summary text chunk by chunk
+    as Bedrock generates it, instead of waiting for the whole completion.
+    """
+    if "anthropic" in model_id:
+        text_config = text_config or {}
+        body = orjson.dumps({
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": text_config.get("maxTokenCount") or _summary_max_tokens(content_page),
+            "temperature": text_config.get("temperature", _DEFAULT_TEXTGEN_CONFIG["temperature"]),
+            "messages": [
+                {"role": "user", "content": SUMMARY_PROMPT + content_page}
+            ]
+        })
+    else:
+        body = _titan_summary_body(content_page, text_config)
+
+    # Shares the cache with `summarize_page`: a hit is sent as a single chunk
+    cache_key = _summary_cache_key(model_id, body)
+    cached = _summary_cache_get(cache_key)
+    if cached is not None:
+        yield cached["result"].get("outputText", "")
+        return
+
+    try:
+        resp = get_client().invoke_model_with_response_stream(
+            modelId=model_id,
+            body=body,
+            contentType="application/json",
+            accept="application/json"
+        )
+    except ClientError as ex:
+        logger.error(f"Couldn't invoke a model: {str(ex)}")
+        raise
+
+    parts = []
+    for text in _iter_stream_text(resp):
+        parts.append(text)
+        yield text
+    # Only a completed stream is cached, never a partial summary
+    _summary_cache_put(cache_key, {"result": {"outputText": "".join(parts)}})
+
+
+def _iter_stream_text(resp):
+    """
+    Yield the generated text of an `invoke_model_with_response_stream` response.
+    """
+    for event in resp["body"]:
+        chunk = event.get("chunk")
+        if not chunk:
+            continue
+        data = orjson.loads(chunk["bytes"])
+        # Titan sends `outputText`, Claude sends `content_block_delta` events
+        if "outputText" in data:
+            yield data["outputText"]
+        elif data.get("type") == "content_block_delta":
+            yield data.get("delta", {}).get("text", "")
+
+
+def _iter_bullets(chunks):
+    """
+    Incrementally parse `{"bullets": [...]}` from streamed text, yielding
+    each bullet as soon as its JSON value is complete.
+
+    Raises ValueError if the text ends before the bullets array is closed.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = None
+    done = False
+    for chunk in chunks:
+        buf += chunk
+        if done:
+            continue
+        if pos is None:
+            key = buf.find('"bullets"')
+            start = buf.find("[", key) if key >= 0 else -1
+            if start < 0:
+                continue
+            pos = start + 1
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buf):
+                break
+            if buf[pos] == "]":
+                done = True
+                break
+            try:
+                bullet, pos = decoder.raw_decode(buf, pos)
+            except ValueError:
+                # Value not complete yet, wait for more text
+                break
+            yield bullet
+    logger.debug("image selection output: %s", buf)
+    if not done:
+        logger.error("Malformed image selection output: %s", buf)
+        raise ValueError("Model output has no complete \"bullets\" array")
+
+
+def _image_sort_key(image):
+    # Stable order keeps the cacheable images block byte-identical
+    return image.get("s3_url") or ""
+
+
+@lru_cache(maxsize=8)
+def _prompt_head(tone):
+    return IMAGE_SELECTION_PROMPT_HEAD.format(tone=tone)
+
+
+def _enrich_bullet(bullet, lookup):
+    """
+    Attach title, caption and tags for each image URL the model picked.
+    """
+    if not isinstance(bullet, dict):
+        return bullet
+    try:
+        nb = dict(bullet)
+        imgs = nb.get("image_url") or nb.get("image_urls") or []
+        images_enriched = []
+        if isinstance(imgs, list):
+            for it in imgs:
+                if isinstance(it, dict):
+                    images_enriched.append(it)
+                    continue
+                title, caption, tags = lookup.get(it, _NO_META)
+                images_enriched.append({
+                    "image_url": it,
+                    "title": title,
+                    "caption": caption,
+                    "tags": list(tags),
+                })
+        nb["images"] = images_enriched
+        return nb
+    except Exception:
+        # If enrichment fails for any reason, return the raw bullet as before
+        return bullet
+
+
+def summarize_and_select_images_stream(
+    article_text: str,
+    images_json: list[dict],
+    config=None
+):
+    """
+    Same as `summarize_and_select_images` but streams the Claude response
+    and yields each enriched bullet as soon as it is generated.
+    """
+    # tone could be "formal", "casual", "technical", "marketing", "humorous"
+    if config is None:
+        config = {"ton": "casual"}
+    tone = config.get("ton", "neutral, concise, professional")
+    # ----------------------------------------
+    # Generate suitable caption/tittle for each image
+    s3_images = [image["s3_url"] for image in images_json]
+    generated = batch_multi_mode_s3_images(s3_images, (_CAPTION_MODE, _TITLE_MODE))
+    captions = generated[_CAPTION_MODE]
+    titles = generated[_TITLE_MODE]
+    for idx in range(len(images_json)):
+        images_json[idx]["caption"] = captions[idx]["result"]
+        images_json[idx]["title"] = titles[idx]["result"]
+        images_json[idx]["tags"] = []
+
+    # ----------------------------------------
+    # Built after captioning so the model sees the generated captions/titles.
+    # Instructions and images come first so they can be a cached prefix.
+    images_block = {
+        "type": "text",
+        "text": "".join([
+            IMAGE_SELECTION_IMAGES_OPEN,
+            orjson.dumps(sorted(images_json, key=_image_sort_key), option=orjson.OPT_SORT_KEYS).decode(),
+            IMAGE_SELECTION_CLOSE,
+        ]),
+    }
+    if settings.BEDROCK_PROMPT_CACHING:
+        images_block["cache_control"] = _EPHEMERAL_CACHE
+    content = [
+        {"type": "text", "text": _prompt_head(tone)},
+        images_block,
+        {"type": "text", "text": IMAGE_SELECTION_ARTICLE_OPEN + article_text + IMAGE_SELECTION_CLOSE},
+    ]
+    body = _CLAUDE_BODY_PREFIX + orjson.dumps(content) + _CLAUDE_BODY_SUFFIX
+
+    # Build lookup from image URLs to (title, caption, tags) once
+    lookup = {
+        url: (img.get("title"), img.get("caption"), img.get("tags") or [])
+        for img in (images_json or [])
+        for key in _META_KEYS
+        if (url := img.get(key))
+    }
+
+    try:
+        resp = get_client().invoke_model_with_response_stream(
+            modelId=BEDROCK_MODEL_ANTHROPIC_CLAUDE35,
+            contentType="application/json",
+            accept="application/json",
+            body=body
+        )
+    except ClientError as ex:
+        logger.error(f"Couldn't invoke a model: {str(ex)}")
+        raise
+
+    for bullet in _iter_bullets(_iter_stream_text(resp)):
+        yield _enrich_bullet(bullet, lookup)
 
 
 def summarize_and_select_images(
     article_text: str,
     images_json: list[dict],
-    config={"ton": "casual"}
+    config=None
 ):
     """
     - This function summarize the page basing on the `article_text` into 3 main bullets,
@@ -122,118 +462,12 @@ def summarize_and_select_images(
                 }
             ]
     """
-    # tone could be "formal", "casual", "technical", "marketing", "humorous"
-    tone = config.get("ton", "neutral, concise, professional")
-    prompt = f"""You are given a long article and a list of candidate images (each includes title, caption/tags, and an S3 URL).
-        You must adopt the requested writing tone throughout: "{tone}". Adjust wording to match this tone while keeping facts unchanged.
-        Do not mention the tone explicitly in the output.
-
-        Tasks:
-        1) Produce 3 main bullet points summarizing the core ideas of the article (≤60 words each, no overlap).
-        2) For each bullet point, select at most three best-matching images from the provided list.
-        3) If there is no any suitable images, return empty images and not invent images.
-        4) Return a valid JSON object with this schema:
-        {{
-        "bullets": [
-            {{
-            "text": "<<=60 words>>",
-            "reason": "<<why this image fits, 1 sentence>>",
-            "image_url": "<<a list of suitable provided images in s3 URLs>>"
-            }}
-        ]
-        }}
-
-        Important rules:
-        - Base your image choice ONLY on the provided image titles/captions/tags (no external fetching).
-        - Output JSON only. No markdown. No explanations outside JSON.
-
-        ARTICLE:
-        <<<
-        {article_text}
-        >>>
-
-        IMAGES:
-        <<<
-        {json.dumps(images_json, ensure_ascii=False)}
-        >>>
-    """
-    # ----------------------------------------
-    # Generate suitable caption/tittle for each image
-    s3_images = [image["s3_url"] for image in images_json]
-    captions = batch_caption_s3_images(s3_images, _CAPTION_MODE)
-    titles = batch_caption_s3_images(s3_images, _TITLE_MODE)
-    for idx in range(len(images_json)):
-        images_json[idx]["caption"] = captions[idx]["result"]
-        images_json[idx]["title"] = titles[idx]["result"]
-        images_json[idx]["tags"] = []
-
-    # ----------------------------------------
-    body = {
-        "anthropic_version": "bedrock-2023-05-31",
-        "max_tokens": 8192,
-        "temperature": 0.2,
-        "messages": [
-            {"role": "user", "content": prompt}
-        ]
-    }
-
-    res = bedrock_client.invoke_model(
-        modelId=BEDROCK_MODEL_ANTHROPIC_CLAUDE35,
-        contentType="application/json",
-        accept="application/json",
-        body=json.dumps(body)
-    )
-    out = json.loads(res["body"].read())
-    print(json.dumps(out, indent=4))
-    text = json.loads(out["content"][0].get("text", {})).get("bullets", [])
-    print("\n\n--------------------------------")
-    print(json.dumps(text, indent=4))
-
-    # Enrich returned bullets: attach title, caption and tags for each image
-    try:
-        # Build lookup from image URLs to metadata
-        lookup = {}
-        for img in images_json or []:
-            for key in ("s3_url", "presigned_url", "source_url"):
-                v = img.get(key)
-                if v:
-                    lookup[v] = img
-
-        enriched = []
-        if isinstance(text, list):
-            for b in text:
-                if not isinstance(b, dict):
-                    enriched.append(b)
-                    continue
-                nb = dict(b)
-                imgs = nb.get("image_url") or nb.get("image_urls") or []
-                images_enriched = []
-                if isinstance(imgs, list):
-                    for it in imgs:
-                        if isinstance(it, dict):
-                            images_enriched.append(it)
-                            continue
-                        meta = lookup.get(it) or {}
-                        images_enriched.append({
-                            "image_url": it,
-                            "title": meta.get("title"),
-                            "caption": meta.get("caption"),
-                            "tags": meta.get("tags") or [],
-                        })
-                nb["images"] = images_enriched
-                enriched.append(nb)
-            return enriched
-    except Exception:
-        # If enrichment fails for any reason, return raw text as before
-        pass
-
-    return text
-
+    return list(summarize_and_select_images_stream(article_text, images_json, config))
 
-def initialize():
-    global bedrock_client
-    region = os.environ.get("REGION", "us-east-1")
-    bedrock_client = boto3.client(service_name="bedrock-runtime", region_name=region)
 
-
-initialize()
+async def summarize_and_select_images_async(*args, **kwargs):
+    """
+    Awaitable `summarize_and_select_images`, see `summarize_page_async`.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, partial(summarize_and_select_images, *args, **kwargs))
@@ -1,19 +1,26 @@
+import atexit
 import os
-import json
-import base64
 import mimetypes
 from typing import List, Dict, Tuple, Optional
 import concurrent.futures as cf
 
-import boto3
+import orjson
 from botocore.exceptions import BotoCoreError, ClientError
+
+from app.utils.bedrock._client import runtime, s3
+
+try:
+    # SIMD-accelerated, byte-identical drop-in for the stdlib encoder
+    import pybase64 as base64
+except ImportError:  # pragma: no cover - fall back when the wheel is unavailable
+    import base64
+
 # --- Config ---
-BEDROCK_REGION = os.getenv("REGION", "us-east-1")
 CLAUDE_MODEL_ID = "anthropic.claude-3-5-sonnet-20240620-v1:0"  # Claude 3.5 Sonnet (multimodal)
 
-session = boto3.Session(region_name=BEDROCK_REGION)
-s3 = session.client("s3")
-runtime = session.client("bedrock-runtime")
+# Shared by every batch so worker threads survive across requests
+_EXECUTOR = cf.ThreadPoolExecutor(max_workers=int(os.getenv("CAPTION_WORKERS", "8")))
+atexit.register(_EXECUTOR.shutdown, wait=False)
 
 
 # --- Helpers ---
@@ -28,14 +35,12 @@ def parse_s3_uri(s3_uri: str) -> Tuple[str, str]:
 
 
 def s3_image_to_base64_and_type(s3_uri: str) -> Tuple[str, str]:
-    """Download image from S3, return (base64, media_type)."""
+    """
+    Download image from S3, return (base64, media_type).
+    """
     bucket, key = parse_s3_uri(s3_uri)
-    try:
-        # Try to get ContentType from head
-        head = s3.head_object(Bucket=bucket, Key=key)
-        content_type = head.get("ContentType") or ""
-    except ClientError:
-        content_type = ""
+    obj = s3.get_object(Bucket=bucket, Key=key)
+    content_type = obj.get("ContentType") or ""
 
     # Fallback: guess from file extension
     if not content_type or content_type == "binary/octet-stream":
@@ -44,9 +49,8 @@ def s3_image_to_base64_and_type(s3_uri: str) -> Tuple[str, str]:
             content_type = guessed
 
     # Read the file
-    obj = s3.get_object(Bucket=bucket, Key=key)
     data = obj["Body"].read()
-    b64 = base64.b64encode(data).decode("utf-8")
+    b64 = base64.b64encode(data).decode("ascii")
 
     # Normalize common types for Claude
     if not content_type:
@@ -95,9 +99,9 @@ def claude_caption_single(image_b64: str, media_type: str, mode: str = "caption"
         modelId=CLAUDE_MODEL_ID,
         contentType="application/json",
         accept="application/json",
-        body=json.dumps(body),
+        body=orjson.dumps(body),
     )
-    out = json.loads(resp["body"].read())
+    out = orjson.loads(resp["body"].read())
     text = out["content"][0]["text"].strip()
     # sanitize a bit: remove surrounding quotes if LLM adds them
     if (text.startswith('"') and text.endswith('"')) or (text.startswith("'") and text.endswith("'")):
@@ -105,10 +109,17 @@ def claude_caption_single(image_b64: str, media_type: str, mode: str = "caption"
     return text
 
 
-def caption_or_title_for_s3_image(s3_uri: str, mode: str = "caption") -> Dict[str, str]:
-    """Process a single image S3 URI and return dict with result."""
+def caption_or_title_for_s3_image(
+    s3_uri: str,
+    mode: str = "caption",
+    image: Optional[Tuple[str, str]] = None
+) -> Dict[str, str]:
+    """
+    Process a single image S3 URI and return dict with result.
+    `image` is its already downloaded (base64, media_type), if any.
+    """
     try:
-        b64, media_type = s3_image_to_base64_and_type(s3_uri)
+        b64, media_type = image or s3_image_to_base64_and_type(s3_uri)
         result = claude_caption_single(b64, media_type, mode=mode)
         return {"s3_uri": s3_uri, "result": result, "mode": mode}
     except (BotoCoreError, ClientError, ValueError) as e:
@@ -117,27 +128,56 @@ def caption_or_title_for_s3_image(s3_uri: str, mode: str = "caption") -> Dict[st
 
 def batch_caption_s3_images(
     s3_uris: List[str],
-    mode: str = "caption",
-    max_workers: int = 4
+    mode: str = "caption"
 ) -> List[Dict[str, str]]:
     """
     Process a list of s3:// URIs concurrently.
     mode: "caption" or "title"
     Returns list of dicts in the SAME ORDER as input.
     """
-    # We want to preserve order; map futures to index
-    results: List[Optional[Dict[str, str]]] = [None] * len(s3_uris)
-    with cf.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_idx = {
-            executor.submit(caption_or_title_for_s3_image, s3_uri, mode): i
-            for i, s3_uri in enumerate(s3_uris)
-        }
-        for fut in cf.as_completed(future_to_idx):
-            idx = future_to_idx[fut]
-            try:
-                results[idx] = fut.result()
-            except Exception as e:
-                results[idx] = {"s3_uri": s3_uris[idx], "error": str(e), "mode": mode}
+    return batch_multi_mode_s3_images(s3_uris, (mode,))[mode]
+
+
+def batch_multi_mode_s3_images(
+    s3_uris: List[str],
+    modes: Tuple[str, ...] = ("caption", "title")
+) -> Dict[str, List[Dict[str, str]]]:
+    """
+    Process every (s3 URI, mode) pair on the shared thread pool so that e.g.
+    captions and titles are generated at the same time.
+    Returns {mode: list of dicts in the SAME ORDER as input}.
+    """
+    # We want to preserve order; map futures to (mode, index)
+    results: Dict[str, List[Optional[Dict[str, str]]]] = {
+        mode: [None] * len(s3_uris) for mode in modes
+    }
+    # Download each image once for this batch and share it between modes;
+    # nothing is kept once the batch returns.
+    fetches = {
+        s3_uri: _EXECUTOR.submit(s3_image_to_base64_and_type, s3_uri)
+        for s3_uri in dict.fromkeys(s3_uris)
+    }
+    images = {}
+    for s3_uri, fut in fetches.items():
+        try:
+            images[s3_uri] = fut.result()
+        except Exception as e:
+            images[s3_uri] = e
+    future_to_idx = {}
+    for i, s3_uri in enumerate(s3_uris):
+        image = images[s3_uri]
+        for mode in modes:
+            if isinstance(image, Exception):
+                results[mode][i] = {"s3_uri": s3_uri, "error": str(image), "mode": mode}
+            else:
+                fut = _EXECUTOR.submit(caption_or_title_for_s3_image, s3_uri, mode, image)
+                future_to_idx[fut] = (mode, i)
+    for fut in cf.as_completed(future_to_idx):
+        mode, idx = future_to_idx[fut]
+        try:
+            results[mode][idx] = fut.result()
+        except Exception as e:
+            results[mode][idx] = {"s3_uri": s3_uris[idx], "error": str(e), "mode": mode}
     # type: ignore
     return results  # type: ignore
 
@@ -149,13 +189,13 @@ if __name__ == "__main__":
     ]
 
     # 1) Get caption
-    captions = batch_caption_s3_images(images, mode="caption", max_workers=4)
+    captions = batch_caption_s3_images(images, mode="caption")
     print("\n------------ caption -------------")
     for caption in captions:
         print(caption)
 
     # 2) Get title
-    titles = batch_caption_s3_images(images, mode="title", max_workers=4)
+    titles = batch_caption_s3_images(images, mode="title")
     print("\n------------ title -------------")
     for title in titles:
         print(title)
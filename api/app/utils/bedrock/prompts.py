@@ -0,0 +1,28 @@
+"""
+Prompt text sent to Bedrock. Kept terse: every token here is paid on each request.
+"""
+
+# Formatted with `max_words`
+SUMMARY_PROMPT_TEMPLATE = (
+    "Summarize the text below in exactly 3 bullet points, ≤{max_words} words each.\n"
+    "Core ideas only; no minor details or repetition. Plain text bullets.\n\n"
+    "Text:\n"
+)
+SUMMARY_PROMPT = SUMMARY_PROMPT_TEMPLATE.format(max_words=100)
+
+# Formatted with `tone`; literal braces are doubled
+IMAGE_SELECTION_PROMPT_HEAD = (
+    "Input: an article and candidate images (title, caption, tags, S3 URL).\n"
+    'Write in a "{tone}" tone without mentioning it; keep facts unchanged.\n'
+    "Tasks:\n"
+    "1) Summarize the article in 3 non-overlapping bullets, ≤60 words each.\n"
+    "2) Per bullet, pick ≤3 best-matching images, judged only by their title/caption/tags. "
+    "If none fit, return an empty list; never invent images.\n"
+    "3) Output JSON only, no markdown, matching: "
+    '{{"bullets":[{{"text":"","reason":"why the images fit, 1 sentence","image_url":["<s3 URL>"]}}]}}'
+)
+# Images go before the article so instructions + images form a stable,
+# cacheable prefix when the same catalog is reused across articles
+IMAGE_SELECTION_IMAGES_OPEN = "IMAGES:\n<<<\n"
+IMAGE_SELECTION_ARTICLE_OPEN = "ARTICLE:\n<<<\n"
+IMAGE_SELECTION_CLOSE = "\n>>>"
@@ -1,9 +1,23 @@
-import boto3
-import json
+import concurrent.futures as cf
+import hashlib
+import orjson
+import os
+import sqlite3
+import threading
+from array import array
+from functools import lru_cache
+from typing import List
 
+from app.utils.bedrock._client import runtime
 
-region = "us-east-1"
-runtime = boto3.client("bedrock-runtime", region_name=region)
+_MAX_WORKERS = 8
+
+_MODEL_ID = "amazon.titan-embed-text-v2:0"
+# /tmp is the only writable path on Lambda; the cache survives warm starts
+_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", "/tmp/titan_embed_cache.sqlite3")
+
+_db_lock = threading.Lock()
+_stats = {"disk_hits": 0, "misses": 0}
 
 # Embedded text
 texts = [
@@ -13,23 +27,89 @@ texts = [
 ]
 
 
-def titan_embed(text: str):
+@lru_cache(maxsize=1)
+def _get_db():
+    db = sqlite3.connect(_CACHE_PATH, check_same_thread=False)
+    db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vec BLOB)")
+    return db
+
+
+def _invoke_titan(text: str) -> array:
     body = {
         "inputText": text
     }
     response = runtime.invoke_model(
-        modelId="amazon.titan-embed-text-v2:0",
+        modelId=_MODEL_ID,
         contentType="application/json",
         accept="application/json",
-        body=json.dumps(body)
+        body=orjson.dumps(body)
     )
-    result = json.loads(response["body"].read())
-    return result["embedding"]
+    result = orjson.loads(response["body"].read())
+    # Packed float32: 4 bytes per dimension instead of a PyObject per float
+    return array("f", result["embedding"])
+
+
+def _disk_cached_embed(text: str) -> array:
+    """
+    Look the embedding up in the SQLite cache, calling Titan only on a miss.
+    """
+    key = hashlib.sha256(f"{_MODEL_ID}\0{text}".encode()).hexdigest()
+    db = _get_db()
+    with _db_lock:
+        row = db.execute("SELECT vec FROM embeddings WHERE key = ?", (key,)).fetchone()
+        if row:
+            _stats["disk_hits"] += 1
+            return array("f", row[0])
+        _stats["misses"] += 1
+
+    vec = _invoke_titan(text)
+    with _db_lock:
+        # Titan returns float32 values, so storing them as float32 is lossless
+        db.execute(
+            "INSERT OR IGNORE INTO embeddings (key, vec) VALUES (?, ?)",
+            (key, vec.tobytes())
+        )
+        db.commit()
+    return vec
+
+
+_memory_cached_embed = lru_cache(maxsize=4096)(_disk_cached_embed)
+
+
+def titan_embed(text: str) -> array:
+    """
+    Titan embedding of `text` as a float32 `array`; a copy, so callers may mutate it.
+    """
+    return _memory_cached_embed(text)[:]
+
+
+def titan_embed_many(texts: List[str], max_workers: int = _MAX_WORKERS) -> List[array]:
+    """
+    Embed many texts in parallel (Titan has no batch endpoint).
+    Duplicates are embedded once; results keep the input order.
+    """
+    unique = list(dict.fromkeys(texts))
+    with cf.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        vectors = dict(zip(unique, executor.map(titan_embed, unique)))
+    return [vectors[t] for t in texts]
+
+
+def cache_stats():
+    """
+    Hit/miss counters for the in-process and on-disk embedding caches.
+    """
+    with _db_lock:
+        return {
+            "memory_hits": _memory_cached_embed.cache_info().hits,
+            "disk_hits": _stats["disk_hits"],
+            "misses": _stats["misses"],
+        }
 
 
-for t in texts:
-    vec = titan_embed(t)
-    print(f"Text: {t}")
-    print(f"Embedding vector length: {len(vec)}")
-    print(f"First 5 dims: {vec[:5]}")
-    print("=" * 50)
+if __name__ == "__main__":
+    for t, vec in zip(texts, titan_embed_many(texts)):
+        print(f"Text: {t}")
+        print(f"Embedding vector length: {len(vec)}")
+        print(f"First 5 dims: {vec[:5]}")
+        print("=" * 50)
+    print(cache_stats())
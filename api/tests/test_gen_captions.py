@@ -0,0 +1,23 @@
+from unittest.mock import patch
+
+from app.utils.bedrock import gen_captions
+
+
+def test_batch_downloads_each_image_once_and_reports_fetch_errors():
+    downloads = []
+
+    def fetch(s3_uri):
+        downloads.append(s3_uri)
+        if s3_uri.endswith("missing.png"):
+            raise ValueError("no such key")
+        return "b64:" + s3_uri, "image/png"
+
+    with patch.object(gen_captions, "s3_image_to_base64_and_type", side_effect=fetch), \
+         patch.object(gen_captions, "claude_caption_single", side_effect=lambda b64, media_type, mode: f"{mode} {b64}"):
+        out = gen_captions.batch_multi_mode_s3_images(
+            ["s3://b/a.png", "s3://b/missing.png", "s3://b/a.png"]
+        )
+
+    assert sorted(downloads) == ["s3://b/a.png", "s3://b/missing.png"]
+    assert [r.get("result") for r in out["title"]] == ["title b64:s3://b/a.png", None, "title b64:s3://b/a.png"]
+    assert out["caption"][1] == {"s3_uri": "s3://b/missing.png", "error": "no such key", "mode": "caption"}
@@ -0,0 +1,65 @@
+from unittest.mock import patch
+
+import orjson
+
+from app import handler
+from app.core.config import settings
+
+
+def _v2_event(method, path, headers=None):
+    return {
+        "rawPath": path,
+        "headers": headers or {},
+        "requestContext": {"http": {"method": method, "path": path}},
+    }
+
+
+def _v1_event(method, path, headers=None):
+    return {"httpMethod": method, "path": path, "headers": headers or {}}
+
+
+def test_health_v2_and_v1():
+    for event in (_v2_event("GET", "/health"), _v1_event("GET", "/health")):
+        resp = handler.lambda_handler(event)
+        assert resp["statusCode"] == 200
+        assert orjson.loads(resp["body"]) == {"status": "ok"}
+
+
+def test_summary_routes_to_summarize_page():
+    with patch.object(handler.bedrock_runtime, "summarize_page", return_value={"result": {"outputText": "- a"}}):
+        resp = handler.lambda_handler(_v1_event("POST", "/bedrock/summary"))
+    assert resp["statusCode"] == 200
+    assert orjson.loads(resp["body"]) == {"result": {"outputText": "- a"}}
+
+
+def test_summary_error_maps_to_500():
+    with patch.object(handler.bedrock_runtime, "summarize_page", side_effect=RuntimeError("boom")):
+        resp = handler.lambda_handler(_v2_event("POST", "/bedrock/summary"))
+    assert resp["statusCode"] == 500
+    assert orjson.loads(resp["body"]) == {"detail": "boom"}
+
+
+def test_unknown_route_is_404():
+    resp = handler.lambda_handler(_v2_event("GET", "/bedrock/summary"))
+    assert resp["statusCode"] == 404
+
+
+def test_options_preflight_echoes_allowed_origin(monkeypatch):
+    monkeypatch.setattr(settings, "ALLOWED_ORIGINS", ["https://a.example", "https://b.example"])
+    resp = handler.lambda_handler(_v1_event("OPTIONS", "/bedrock/summary", {"Origin": "https://b.example"}))
+    assert resp["statusCode"] == 200
+    headers = resp["headers"]
+    assert headers["Access-Control-Allow-Origin"] == "https://b.example"
+    assert headers["Access-Control-Allow-Credentials"] == "true"
+    assert headers["Vary"] == "Origin"
+
+    resp = handler.lambda_handler(_v2_event("OPTIONS", "/health", {"origin": "https://evil.example"}))
+    assert "Access-Control-Allow-Origin" not in resp["headers"]
+
+
+def test_wildcard_origin(monkeypatch):
+    monkeypatch.setattr(settings, "ALLOWED_ORIGINS", ["*"])
+    resp = handler.lambda_handler(_v2_event("GET", "/health"))
+    assert resp["headers"]["Access-Control-Allow-Origin"] == "*"
+    resp = handler.lambda_handler(_v2_event("GET", "/health", {"origin": "https://a.example"}))
+    assert resp["headers"]["Access-Control-Allow-Origin"] == "https://a.example"
@@ -0,0 +1,28 @@
+import pytest
+
+from app.utils.bedrock.bedrock_runtime import _iter_bullets
+
+
+def test_iter_bullets_chunks_split_mid_string():
+    text = '{"bullets": [{"text": "first, with ] and \\"quotes\\"", "image_url": []}, {"text": "second"}]}'
+    chunks = [text[i:i + 5] for i in range(0, len(text), 5)]
+    assert list(_iter_bullets(chunks)) == [
+        {"text": 'first, with ] and "quotes"', "image_url": []},
+        {"text": "second"},
+    ]
+
+
+def test_iter_bullets_empty_array():
+    assert list(_iter_bullets(['{"bul', 'lets": [ ', "]}"])) == []
+
+
+def test_iter_bullets_without_bullets_key_raises():
+    with pytest.raises(ValueError):
+        list(_iter_bullets(['{"summary": "no bullets here"}']))
+
+
+def test_iter_bullets_truncated_output_raises():
+    bullets = _iter_bullets(['{"bullets": [{"text": "a"}, {"text": "b'])
+    assert next(bullets) == {"text": "a"}
+    with pytest.raises(ValueError):
+        next(bullets)
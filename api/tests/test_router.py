@@ -0,0 +1,78 @@
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.utils.bedrock import bedrock_runtime
+
+client = TestClient(app)
+
+
+def _events(body):
+    return [block for block in body.split("\n\n") if block]
+
+
+def test_summary_stream_is_sse_framed():
+    with patch.object(bedrock_runtime, "summarize_page_stream", return_value=iter(["- one\n", "- two"])):
+        resp = client.post("/bedrock/summary?stream=true")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    assert _events(resp.text) == [
+        'data: {"text":"- one\\n"}',
+        'data: {"text":"- two"}',
+        "event: done\ndata: {}",
+    ]
+
+
+def test_summary_stream_error_before_output_is_500():
+    def failing():
+        raise RuntimeError("boom")
+        yield  # pragma: no cover
+
+    with patch.object(bedrock_runtime, "summarize_page_stream", return_value=failing()):
+        resp = client.post("/bedrock/summary?stream=true")
+    assert resp.status_code == 500
+    assert resp.json() == {"detail": "boom"}
+
+
+def test_summary_stream_error_mid_stream_is_error_event():
+    def partial():
+        yield "- one"
+        raise RuntimeError("boom")
+
+    with patch.object(bedrock_runtime, "summarize_page_stream", return_value=partial()):
+        resp = client.post("/bedrock/summary?stream=true")
+    assert resp.status_code == 200
+    assert _events(resp.text) == ['data: {"text":"- one"}', 'event: error\ndata: {"detail":"boom"}']
+
+
+def test_summary_without_stream():
+    with patch.object(bedrock_runtime, "summarize_page", return_value={"result": {"outputText": "- a"}}):
+        resp = client.post("/bedrock/summary")
+    assert resp.status_code == 200
+    assert resp.json() == {"result": {"outputText": "- a"}}
+
+
+def test_summary_without_stream_error_is_500():
+    with patch.object(bedrock_runtime, "summarize_page", side_effect=RuntimeError("boom")):
+        resp = client.post("/bedrock/summary")
+    assert resp.status_code == 500
+
+
+def test_stream_reuses_summary_cache():
+    bedrock_runtime._summary_cache.clear()
+    body = bedrock_runtime._titan_summary_body("page", None)
+    key = bedrock_runtime._summary_cache_key(bedrock_runtime.BEDROCK_MODEL_AWS_TITANT, body)
+    bedrock_runtime._summary_cache_put(key, {"result": {"outputText": "- cached"}}, persist=False)
+    with patch.object(bedrock_runtime, "get_client") as get_client:
+        assert list(bedrock_runtime.summarize_page_stream("page")) == ["- cached"]
+    get_client.assert_not_called()
+    bedrock_runtime._summary_cache.clear()
+
+
+def test_summary_defaults_to_json_and_documents_sse():
+    with patch.object(bedrock_runtime, "summarize_page", return_value={"result": {"outputText": "- a"}}):
+        resp = client.post("/bedrock/summary")
+    assert resp.headers["content-type"] == "application/json"
+    content = app.openapi()["paths"]["/bedrock/summary"]["post"]["responses"]["200"]["content"]
+    assert {"application/json", "text/event-stream"} <= set(content)
@@ -0,0 +1,27 @@
+"""
+JSON helpers for Bedrock payloads: orjson when it is installed, stdlib json otherwise.
+Both produce compact output with non-ASCII characters kept as is.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:  # optional speed-up, not a required dependency
+    orjson = None
+
+if orjson is not None:
+    loads = orjson.loads
+
+    def dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+
+    def dumpb(obj) -> bytes:
+        return orjson.dumps(obj)
+else:
+    loads = json.loads
+
+    def dumps(obj) -> str:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+    def dumpb(obj) -> bytes:
+        return dumps(obj).encode()
@@ -1,10 +1,15 @@
 """
 Lists the available Amazon Bedrock models.
 """
+import asyncio
 import logging
 import json
-import boto3
+import time
 import os
+import random
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from types import MappingProxyType
 
 from botocore.exceptions import ClientError
 from app.constants import (
@@ -12,7 +17,12 @@ from app.constants import (
     BEDROCK_MODEL_ANTHROPIC_CLAUDE35
 )
 from app.core.config import settings
-from .gen_captions import batch_caption_s3_images
+from . import _json, semantic_cache
+from .gen_captions import (
+    BEDROCK_REGION,
+    batch_multi_mode_s3_images,
+    boto_client,
+)
 
 # Allow overriding with inference profile ARN for models that require it
 CLAUDE_INFERENCE_PROFILE = os.environ.get("CLAUDE_INFERENCE_PROFILE_ARN")
@@ -26,12 +36,97 @@ _DEFAULT_PROMPT = """
 
     Text:\n
 """
+_IMAGE_SELECTION_PROMPT = """You are given a long article and a list of candidate images (each includes title, caption/tags, and an S3 URL).
+    Tasks:
+    1) Produce {num_bullets} main bullet points summarizing the core ideas of the article (≤{max_words_per_bullet} words each, no overlap).
+    2) For each bullet point, select at most three best-matching images from the provided list.
+    3) If there are no suitable images, return empty images and do not invent images.
+    4) Return a valid JSON object with this schema:
+    {{
+      "bullets": [
+        {{
+          "text": "<<= {max_words_per_bullet} words>>",
+          "reason": "<<why this image fits, 1 sentence>>",
+          "image_url": "<<a list of suitable provided images in s3 URLs>>"
+        }}
+      ]
+    }}
+
+    Important rules:
+    - Base your image choice ONLY on the provided image titles/captions/tags (no external fetching).
+    - Output JSON only. No markdown. No explanations outside JSON.
+"""
+
+# Several pages in one call; ids let the answer be matched back to the input
+_BATCH_PROMPT = """
+    Summarize each text below (delimited by <<<PAGE id=N>>> markers) into exactly {num_bullets} main bullet points:
+    - Each bullet point must be no longer than {max_words_per_bullet} words.
+    - Focus only on the core ideas, avoid minor details or repetition.
+    - Return JSON only, no markdown: {{"summaries": [{{"id": <page id>, "text": "<plain text bullets>"}}]}}
+
+"""
+# Keeps a batch's summaries well inside the output token cap
+_BATCH_MAX_PAGES = 8
+# Decodes the first JSON object in model output that has text around it
+_JSON_DECODER = json.JSONDecoder()
 
 # Module-level default for number of bullets
 DEFAULT_NUM_BULLETS = 3
-logging.basicConfig(level=logging.INFO)
+# Read-only so the shared default can't be mutated by a caller
+_DEFAULT_TEXTGEN_CONFIG = MappingProxyType({
+    "maxTokenCount": 8192,
+    "temperature": 0.7
+})
+# Lowest output cap among the models we call (Claude 3, Titan Lite);
+# Titan Express's 8192 default would be rejected by the others
+_MAX_OUTPUT_TOKENS = 4096
+# Models (or inference profiles of them) that accept Converse cache points;
+# older Claude 3 and Titan text models reject them
+_PROMPT_CACHE_MODELS = (
+    "anthropic.claude-3-5-haiku",
+    "anthropic.claude-3-7-sonnet",
+    "anthropic.claude-sonnet-4",
+    "anthropic.claude-opus-4",
+    "amazon.nova-",
+)
+# Tried in order after the requested model by summarize_page
+_FALLBACK_MODELS = (
+    "amazon.titan-text-express-v1",
+    "anthropic.claude-3-haiku-20240307-v1:0",
+    "amazon.titan-text-lite-v1",
+)
+# Errors meaning the model itself is unusable here, so the next one is tried.
+# Throttling and 5xx are transient and already retried by botocore (BOTO_CONFIG).
+_FALLBACK_ERRORS = frozenset({"AccessDeniedException", "ValidationException"})
 logger = logging.getLogger(__name__)
 
+# Models probed by check_model_access, and where its result is cached
+_PROBE_MODELS = (
+    "amazon.titan-text-express-v1",
+    "amazon.titan-text-lite-v1",
+    "anthropic.claude-3-haiku-20240307-v1:0",
+    "anthropic.claude-3-sonnet-20240229-v1:0",
+    "anthropic.claude-3-5-sonnet-20240620-v1:0",
+)
+# Model access is granted per region
+_ACCESS_CACHE_PATH = f"/tmp/bedrock_access_{BEDROCK_REGION}.json"
+_ACCESS_CACHE_TTL = 3600
+# How long a summarize call trusts the in-process copy before looking at /tmp again
+_ACCESS_MEMO_TTL = 60
+
+# Runs the blocking boto3 calls behind the *_async wrappers
+_bedrock_pool = ThreadPoolExecutor(max_workers=16)
+# Retries (full-jitter exponential backoff) when Bedrock throttles a batch
+_THROTTLE_RETRIES = 4
+_THROTTLE_BASE_DELAY = 0.5
+
+
+def get_client():
+    """
+    Return the shared bedrock-runtime client.
+    """
+    return boto_client("bedrock-runtime")
+
 
 def list_foundation_models():
     """
@@ -41,13 +136,11 @@ def list_foundation_models():
     """
 
     try:
-        response = bedrock_client.list_foundation_models()
+        response = boto_client("bedrock").list_foundation_models()
         fm_models = response["modelSummaries"]
         logger.info("Got %s foundation models.", len(fm_models))
-        for model in fm_models:
-            print(f"Model: {model['modelName']}")
-            print(json.dumps(model, indent=2))
-            print("---------------------------\n")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("models: %s", [m["modelName"] for m in fm_models])
 
         logger.info("Done.")
         return fm_models
@@ -59,171 +152,318 @@ def list_foundation_models():
         raise
 
 
-def check_model_access():
+def _inference_config(cfg, temperature):
     """
-    Check which models are accessible by trying to list them.
-    
-    :return: List of accessible model IDs
+    Converse `inferenceConfig` from a Titan- or Claude-style text config.
     """
-    accessible_models = []
-    test_models = [
-        "amazon.titan-text-express-v1",
-        "amazon.titan-text-lite-v1",
-        "anthropic.claude-3-haiku-20240307-v1:0",
-        "anthropic.claude-3-sonnet-20240229-v1:0",
-        "anthropic.claude-3-5-sonnet-20240620-v1:0",
-    ]
-    
-    for model_id in test_models:
-        try:
-            # Build a minimal request that matches the model's expected schema.
-            # Anthropic/Claude models expect a `messages` array, while Titan
-            # models expect an `inputText` + `textGenerationConfig`.
-            if "anthropic" in (model_id or "") or "claude" in (model_id or ""):
-                body_obj = {
-                    "anthropic_version": "bedrock-2023-05-31",
-                    "max_tokens": 10,
-                    "temperature": 0.1,
-                    "messages": [{"role": "user", "content": "test"}],
-                }
-            else:
-                body_obj = {
-                    "inputText": "test",
-                    "textGenerationConfig": {"maxTokenCount": 10, "temperature": 0.1},
-                }
+    max_tokens = cfg.get("maxTokenCount") or cfg.get("max_tokens") or _MAX_OUTPUT_TOKENS
+    return {
+        "maxTokens": min(max_tokens, _MAX_OUTPUT_TOKENS),
+        "temperature": cfg.get("temperature", temperature),
+    }
 
-            bedrock_client.invoke_model(
-                modelId=model_id,
-                body=json.dumps(body_obj),
-                contentType="application/json",
-                accept="application/json",
-            )
-            accessible_models.append(model_id)
-            logger.info(f"✓ Model {model_id} is accessible")
 
-        except ClientError as ex:
-            err = ex.response.get('Error', {}) if hasattr(ex, 'response') else {}
-            error_code = err.get('Code', 'Unknown')
-            # Keep the message but avoid confusing ValidationExceptions caused
-            # by using the wrong request schema when probing models.
-            logger.warning(f"✗ Model {model_id} not accessible: {error_code} Message={err.get('Message')}")
-            logger.debug("ClientError response for model %s: %s", model_id, getattr(ex, 'response', str(ex)))
-        except Exception as ex:
-            logger.warning(f"✗ Model {model_id} test failed: {str(ex)}")
-    
-    # If an inference profile ARN is configured for Claude models, try invoking it
-    # as well. Many Anthropic/Claude 3.5 variants require invocation via an
-    # inference profile ARN rather than the raw model ID; probing the ARN lets
-    # us report the downstream model as accessible to UI clients.
+def _supports_prompt_cache(model_id):
+    # Substring match so inference-profile IDs/ARNs of these models qualify too
+    return any(marker in model_id for marker in _PROMPT_CACHE_MODELS)
+
+
+def _converse(model_id, text, inference_config, cached_prefix=None):
+    """
+    Single-turn Converse call; one request schema for Titan and Claude models.
+    `cached_prefix` is sent as the system prompt behind a cache point on models
+    that support prompt caching, and is prepended to `text` on the others.
+    """
+    kwargs = {}
+    if cached_prefix and _supports_prompt_cache(model_id):
+        kwargs["system"] = [{"text": cached_prefix}, {"cachePoint": {"type": "default"}}]
+    elif cached_prefix:
+        text = cached_prefix + text
+    resp = get_client().converse(
+        modelId=model_id,
+        messages=[{"role": "user", "content": [{"text": text}]}],
+        inferenceConfig=inference_config,
+        **kwargs,
+    )
+    if kwargs:
+        usage = resp.get("usage", {})
+        logger.info(
+            f"Prompt cache for {model_id}: read={usage.get('cacheReadInputTokens', 0)} "
+            f"write={usage.get('cacheWriteInputTokens', 0)} tokens"
+        )
+    return resp
+
+
+def _converse_text(resp):
+    return "".join(block.get("text", "") for block in resp["output"]["message"]["content"])
+
+
+_PROBE_CONFIG = MappingProxyType({"maxTokens": 10, "temperature": 0.1})
+
+
+def _probe_one(model_id):
+    """
+    Invoke `model_id` with a minimal request; returns (model_id, accessible).
+    """
     try:
-        if CLAUDE_INFERENCE_PROFILE:
-            try:
-                logger.info(f"Probing inference profile ARN: {CLAUDE_INFERENCE_PROFILE}")
-                # Use an Anthropic/Claude-style minimal probe body
-                probe_body = json.dumps({
-                    "anthropic_version": "bedrock-2023-05-31",
-                    "max_tokens": 5,
-                    "temperature": 0.1,
-                    "messages": [{"role": "user", "content": "test"}],
-                })
-                bedrock_client.invoke_model(
-                    modelId=CLAUDE_INFERENCE_PROFILE,
-                    body=probe_body,
-                    contentType="application/json",
-                    accept="application/json",
-                )
-                # If invocation succeeded, surface the known Claude 3.5 model id
-                if BEDROCK_MODEL_ANTHROPIC_CLAUDE35 not in accessible_models:
-                    accessible_models.append(BEDROCK_MODEL_ANTHROPIC_CLAUDE35)
-                    logger.info(f"✓ Inference profile probe succeeded; reporting {BEDROCK_MODEL_ANTHROPIC_CLAUDE35} as accessible")
-            except Exception as ex:
-                logger.debug(f"Inference profile probe failed: {str(ex)}")
-    except Exception:
+        _converse(model_id, "test", dict(_PROBE_CONFIG))
+        logger.info(f"✓ Model {model_id} is accessible")
+        return model_id, True
+    except ClientError as ex:
+        err = ex.response.get('Error', {}) if hasattr(ex, 'response') else {}
+        error_code = err.get('Code', 'Unknown')
+        logger.warning(f"✗ Model {model_id} not accessible: {error_code} Message={err.get('Message')}")
+        logger.debug("ClientError response for model %s: %s", model_id, getattr(ex, 'response', str(ex)))
+    except Exception as ex:
+        logger.warning(f"✗ Model {model_id} test failed: {str(ex)}")
+    return model_id, False
+
+
+def _probe_inference_profile():
+    # Many Anthropic/Claude 3.5 variants require invocation via an inference
+    # profile ARN rather than the raw model ID; probing the ARN lets us report
+    # the downstream model as accessible to UI clients.
+    if not CLAUDE_INFERENCE_PROFILE:
+        return False
+    try:
+        logger.info(f"Probing inference profile ARN: {CLAUDE_INFERENCE_PROFILE}")
+        _converse(CLAUDE_INFERENCE_PROFILE, "test", dict(_PROBE_CONFIG))
+        return True
+    except Exception as ex:
+        logger.debug(f"Inference profile probe failed: {str(ex)}")
+        return False
+
+
+def _read_access_cache():
+    """
+    Accessible models from a probe run within the TTL, or None if there is none.
+    """
+    try:
+        if time.time() - os.path.getmtime(_ACCESS_CACHE_PATH) < _ACCESS_CACHE_TTL:
+            with open(_ACCESS_CACHE_PATH) as f:
+                return tuple(json.load(f))
+    except (OSError, ValueError):
         pass
+    return None
 
-    return accessible_models
 
+# (accessible models or None, time.monotonic() it is valid until)
+_access_memo = (None, 0.0)
 
-def summarize_page(
-    content_page="",
-    text_config={},
-    model_id=BEDROCK_MODEL_AWS_TITANT,
-    media_refs=None,
-):
-    _TextGenerationConfig = {
-        "maxTokenCount": 8192,
-        "temperature": 0.7
-    }
 
-    # List of models to try in order of preference
-    fallback_models = [
-        model_id,  # Use the requested model first
-        "amazon.titan-text-express-v1",
-        "anthropic.claude-3-haiku-20240307-v1:0",
-        "amazon.titan-text-lite-v1",
-    ]
-    
-    # Remove duplicates while preserving order
-    models_to_try = []
-    seen = set()
-    for model in fallback_models:
-        if model not in seen:
-            models_to_try.append(model)
-            seen.add(model)
+def _known_accessible_models():
+    """
+    Accessible models from a recent probe, or None. Served from memory;
+    the /tmp file is only read once the in-process copy has expired.
+    """
+    global _access_memo
+    models, expires = _access_memo
+    if time.monotonic() >= expires:
+        models = _read_access_cache()
+        _access_memo = (models, time.monotonic() + _ACCESS_MEMO_TTL)
+    return models
+
+
+@lru_cache(maxsize=1)
+def _check_model_access_cached(_ttl_bucket):
+    global _access_memo
+    # Reuse the result written by an earlier (e.g. cold-start) invocation
+    cached = _read_access_cache()
+    if cached is not None:
+        _access_memo = (cached, time.monotonic() + _ACCESS_MEMO_TTL)
+        return cached
+
+    with ThreadPoolExecutor(max_workers=len(_PROBE_MODELS) + 1) as ex:
+        profile_ok = ex.submit(_probe_inference_profile)
+        results = list(ex.map(_probe_one, _PROBE_MODELS))
+        profile_ok = profile_ok.result()
+
+    accessible_models = [model_id for model_id, ok in results if ok]
+    # If the inference profile works, surface the known Claude 3.5 model id
+    if profile_ok and BEDROCK_MODEL_ANTHROPIC_CLAUDE35 not in accessible_models:
+        accessible_models.append(BEDROCK_MODEL_ANTHROPIC_CLAUDE35)
+        logger.info(f"✓ Inference profile probe succeeded; reporting {BEDROCK_MODEL_ANTHROPIC_CLAUDE35} as accessible")
+
+    try:
+        with open(_ACCESS_CACHE_PATH, "w") as f:
+            json.dump(accessible_models, f)
+    except OSError as ex:
+        logger.debug(f"Couldn't write model access cache: {str(ex)}")
+    _access_memo = (tuple(accessible_models), time.monotonic() + _ACCESS_MEMO_TTL)
+    return tuple(accessible_models)
+
+
+def check_model_access(force=False):
+    """
+    Check which models are accessible by probing them concurrently.
+    The result is cached in-process and in /tmp for `_ACCESS_CACHE_TTL` seconds.
+
+    :param force: Drop the cached result and probe again
+    :return: List of accessible model IDs
+    """
+    global _access_memo
+    if force:
+        _check_model_access_cached.cache_clear()
+        _access_memo = (None, 0.0)
+        try:
+            os.remove(_ACCESS_CACHE_PATH)
+        except OSError:
+            pass
+    return list(_check_model_access_cached(int(time.time() // _ACCESS_CACHE_TTL)))
+
+
+@lru_cache(maxsize=8)
+def _models_to_try(model_id):
+    return tuple(dict.fromkeys((model_id, *_FALLBACK_MODELS)))
+
+
+@lru_cache(maxsize=16)
+def _summary_prompt(num_bullets, max_words_per_bullet):
+    return _DEFAULT_PROMPT.format(num_bullets=num_bullets, max_words_per_bullet=max_words_per_bullet)
+
+
+@lru_cache(maxsize=16)
+def _image_selection_prompt(num_bullets, max_words_per_bullet):
+    return _IMAGE_SELECTION_PROMPT.format(num_bullets=num_bullets, max_words_per_bullet=max_words_per_bullet)
+
+
+def _summary_models(model_id):
+    # Use the requested model first, then the fallbacks. If a recent
+    # check_model_access run is on hand, skip fallbacks known to be denied;
+    # the requested model is always tried, probed or not.
+    models_to_try = _models_to_try(model_id)
+    accessible = _known_accessible_models()
+    if accessible:
+        fallbacks = [m for m in models_to_try[1:] if m in accessible]
+        models_to_try = [models_to_try[0], *fallbacks]
+    return models_to_try
+
 
+def _summary_input(content_page, text_config, media_refs):
     # If media references were provided, build a small JSON block to append for structured context
     media_block = ""
     try:
         if media_refs:
             # Normalize media refs to only include useful keys
-            normalized = []
-            for m in media_refs:
-                normalized.append({
+            normalized = [
+                {
                     "source_url": m.get("source_url"),
                     "presigned_url": m.get("presigned_url") or m.get("s3_url"),
                     "s3_key": m.get("s3_key"),
                     "alt": m.get("alt"),
                     "title": m.get("title"),
                     "type": m.get("type"),
-                })
-            media_json = json.dumps(normalized, indent=2)
+                }
+                for m in media_refs
+            ]
+            # Compact separators: the block is model input, whitespace costs tokens
+            media_json = _json.dumps(normalized)
             media_block = f"\n\nAdditional media references (JSON):\n{media_json}\n"
     except Exception:
         media_block = ""
 
     # Resolve num_bullets from text_config only (no explicit arg)
-    num_bullets = (text_config or {}).get('num_bullets', DEFAULT_NUM_BULLETS)
-    body = json.dumps({
-        "inputText": _DEFAULT_PROMPT.format(num_bullets=num_bullets, max_words_per_bullet=(text_config or {}).get('max_words_per_bullet', 100)) + content_page + media_block,
-        "textGenerationConfig": {
-            **_TextGenerationConfig,
-            **text_config
-        }
-    })
+    num_bullets = text_config.get('num_bullets', DEFAULT_NUM_BULLETS)
+    return _summary_prompt(num_bullets, text_config.get('max_words_per_bullet', 100)) + content_page + media_block
+
+
+def _iter_stream_text(resp):
+    """
+    Yield the generated text of a `converse_stream` response.
+    """
+    for event in resp["stream"]:
+        delta = event.get("contentBlockDelta")
+        if delta:
+            yield delta["delta"].get("text", "")
+
 
+def _summarize_page_stream(models_to_try, input_text, inference_config):
     last_error = None
-    
     for try_model in models_to_try:
         try:
-            logger.info(f"Attempting to use model: {try_model}")
-            resp = bedrock_client.invoke_model(
+            resp = get_client().converse_stream(
                 modelId=try_model,
-                body=body,
-                contentType="application/json",
-                accept="application/json"
+                messages=[{"role": "user", "content": [{"text": input_text}]}],
+                inferenceConfig=inference_config,
             )
-            
-            output = json.loads(resp["body"].read())
-            results = output.get("results", [])
-            
-            if settings.DEBUG:
-                print(json.dumps(output, indent=4))
-                for idx, result in enumerate(results):
-                    print(f"---> Result {idx}:", result.get("outputText", ""))
+        except ClientError as ex:
+            last_error = ex
+            error_code = ex.response.get('Error', {}).get('Code', 'Unknown')
+            logger.warning(f"Model {try_model} failed with {error_code}: {str(ex)}")
+            # Same policy as summarize_page
+            if error_code in _FALLBACK_ERRORS:
+                continue
+            break
+        logger.info(f"Streaming summary from model: {try_model}")
+        yield from _iter_stream_text(resp)
+        return
+
+    logger.error(f"All models failed. Last error: {str(last_error)}")
+    raise last_error
+
 
+def summarize_page(
+    content_page="",
+    text_config=None,
+    model_id=BEDROCK_MODEL_AWS_TITANT,
+    media_refs=None,
+    stream=False,
+):
+    """
+    Summarize `content_page`, falling back through `_FALLBACK_MODELS` on access errors.
+    With `stream=True`, return an iterator over the summary text as it is generated
+    instead of waiting for the full response.
+    """
+    text_config = text_config or _DEFAULT_TEXTGEN_CONFIG
+    models_to_try = _summary_models(model_id)
+    input_text = _summary_input(content_page, text_config, media_refs)
+    inference_config = _inference_config(text_config, _DEFAULT_TEXTGEN_CONFIG["temperature"])
+    if stream:
+        return _summarize_page_stream(models_to_try, input_text, inference_config)
+
+    # Near-duplicate pages (re-crawls) reuse an earlier summary
+    cache_ns = None
+    if semantic_cache.ENABLED and content_page:
+        try:
+            cache_ns = semantic_cache.namespace(model_id, text_config)
+            cached, page_vec = semantic_cache.lookup(cache_ns, content_page)
+            if cached is not None:
+                return cached
+        except Exception as ex:
+            logger.warning(f"Semantic cache lookup failed: {str(ex)}")
+            cache_ns = None
+
+    resp, model_used = _converse_with_fallback(models_to_try, input_text, inference_config)
+    # Same keys as the Titan result the handler post-processes
+    result = {"outputText": _converse_text(resp), "completionReason": resp.get("stopReason")}
+
+    if settings.DEBUG:
+        print(json.dumps(resp["output"], indent=4))
+        print("---> Result:", result["outputText"])
+
+    summary = {"result": result, "model_used": model_used}
+    if cache_ns is not None:
+        try:
+            semantic_cache.store(cache_ns, page_vec, summary)
+        except Exception as ex:
+            logger.warning(f"Semantic cache store failed: {str(ex)}")
+    return summary
+
+
+def _converse_with_fallback(models_to_try, input_text, inference_config):
+    """
+    Converse with the first model that accepts the request; returns (response, model).
+    Only access errors fall through to the next model.
+    """
+    last_error = None
+    
+    for try_model in models_to_try:
+        try:
+            logger.info(f"Attempting to use model: {try_model}")
+            resp = _converse(try_model, input_text, inference_config)
             # If we get here, the model worked
             logger.info(f"Successfully used model: {try_model}")
-            return {"result": results[0] if results else {}, "model_used": try_model}
+            return resp, try_model
             
         except ClientError as ex:
             last_error = ex
@@ -232,11 +472,11 @@ def summarize_page(
             logger.warning(f"Model {try_model} failed with {error_code}: {err.get('Message')} - {str(ex)}")
             logger.debug("Full ClientError response for model %s: %s", try_model, getattr(ex, 'response', str(ex)))
             
-            # If it's an access denied error, try the next model
-            if error_code == 'AccessDeniedException':
+            # The model is unusable here, try the next one
+            if error_code in _FALLBACK_ERRORS:
                 continue
             else:
-                # For other errors, don't try more models
+                # Transient errors were already retried by botocore; another model won't help
                 break
         except Exception as ex:
             last_error = ex
@@ -248,13 +488,161 @@ def summarize_page(
     raise last_error
 
 
-def initialize():
-    global bedrock_client
-    region = os.environ.get("REGION", "ap-southeast-2")
-    bedrock_client = boto3.client(service_name="bedrock-runtime", region_name=region)
+def _parse_batch_summaries(text):
+    try:
+        data, _ = _JSON_DECODER.raw_decode(text, text.index("{"))
+        return {int(s["id"]): s["text"] for s in data.get("summaries", []) if s.get("text")}
+    except (ValueError, TypeError, KeyError, AttributeError):
+        logger.warning("Couldn't parse batch summaries; summarizing pages one by one")
+        return {}
+
+
+def summarize_page_batch(pages, text_config=None, model_id=BEDROCK_MODEL_AWS_TITANT):
+    """
+    Summarize several short pages with one model call per `_BATCH_MAX_PAGES`
+    pages, amortizing the per-request overhead. Returns `summarize_page`
+    results in input order; a page missing from the model's answer is
+    summarized on its own.
+    """
+    text_config = text_config or _DEFAULT_TEXTGEN_CONFIG
+    models_to_try = _summary_models(model_id)
+    inference_config = _inference_config(text_config, _DEFAULT_TEXTGEN_CONFIG["temperature"])
+    prompt = _BATCH_PROMPT.format(
+        num_bullets=text_config.get('num_bullets', DEFAULT_NUM_BULLETS),
+        max_words_per_bullet=text_config.get('max_words_per_bullet', 100),
+    )
+
+    results = []
+    for start in range(0, len(pages), _BATCH_MAX_PAGES):
+        batch = pages[start:start + _BATCH_MAX_PAGES]
+        input_text = prompt + "".join(f"<<<PAGE id={i}>>>\n{page}\n" for i, page in enumerate(batch))
+        resp, model_used = _converse_with_fallback(models_to_try, input_text, inference_config)
+        summaries = _parse_batch_summaries(_converse_text(resp))
+        for i, page in enumerate(batch):
+            if i in summaries:
+                results.append({"result": {"outputText": summaries[i]}, "model_used": model_used})
+            else:
+                results.append(summarize_page(content_page=page, text_config=text_config, model_id=model_id))
+    return results
 
 
-initialize()
+async def summarize_page_async(*args, **kwargs):
+    """
+    Awaitable `summarize_page`: the blocking boto3 call (and model fallbacks)
+    run on `_bedrock_pool` so many pages can be summarized concurrently.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_bedrock_pool, partial(summarize_page, *args, **kwargs))
+
+
+async def _summarize_with_backoff(content_page, **kwargs):
+    for attempt in range(_THROTTLE_RETRIES + 1):
+        try:
+            return await summarize_page_async(content_page=content_page, **kwargs)
+        except ClientError as ex:
+            code = ex.response.get("Error", {}).get("Code")
+            if code != "ThrottlingException" or attempt == _THROTTLE_RETRIES:
+                raise
+            delay = random.uniform(0, _THROTTLE_BASE_DELAY * 2 ** attempt)
+            logger.warning(f"Throttled by Bedrock, retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+
+async def summarize_pages(pages, concurrency=16, **kwargs):
+    """
+    Summarize many pages concurrently, at most `concurrency` requests in flight.
+    Results keep the input order; a page that fails yields its exception
+    instead of cancelling the rest of the batch.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _one(page):
+        async with semaphore:
+            return await _summarize_with_backoff(page, **kwargs)
+
+    return await asyncio.gather(*(_one(page) for page in pages), return_exceptions=True)
+
+
+async def summarize_and_select_images_async(*args, **kwargs):
+    """
+    Awaitable `summarize_and_select_images`, see `summarize_page_async`.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_bedrock_pool, partial(summarize_and_select_images, *args, **kwargs))
+
+
+async def check_model_access_async():
+    """
+    Awaitable `check_model_access`, see `summarize_page_async`.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_bedrock_pool, check_model_access)
+
+
+def _image_index(images_json):
+    """
+    Map every s3_url/presigned_url/source_url of `images_json` to its image.
+    """
+    return {
+        url: img
+        for img in images_json or []
+        for key in ("s3_url", "presigned_url", "source_url")
+        if (url := img.get(key))
+    }
+
+
+def _enrich_bullets(bullets_list, idx_map):
+    """
+    Replace each bullet's image URLs with {image_url, title, caption, tags}
+    looked up in `idx_map` (see `_image_index`).
+    """
+    if not isinstance(bullets_list, list):
+        return bullets_list
+    try:
+        enriched = []
+        for b in bullets_list:
+            try:
+                if not isinstance(b, dict):
+                    enriched.append(b)
+                    continue
+                imgs = b.get("image_url")
+                if not imgs:
+                    enriched.append(b)
+                    continue
+                # normalize to list
+                if isinstance(imgs, str):
+                    imgs_list = [imgs]
+                elif isinstance(imgs, list):
+                    imgs_list = imgs
+                else:
+                    enriched.append(b)
+                    continue
+
+                new_imgs = []
+                for u in imgs_list:
+                    if not isinstance(u, str):
+                        new_imgs.append(u)
+                        continue
+                    meta = idx_map.get(u)
+                    if meta:
+                        new_imgs.append({
+                            "image_url": u,
+                            "title": meta.get("title") or None,
+                            "caption": meta.get("caption") or None,
+                            "tags": meta.get("tags") or [],
+                        })
+                    else:
+                        # fallback: include original URL string
+                        new_imgs.append({"image_url": u})
+
+                nb = dict(b)
+                nb["image_url"] = new_imgs
+                enriched.append(nb)
+            except Exception:
+                enriched.append(b)
+        return enriched
+    except Exception:
+        return bullets_list
 
 
 def summarize_and_select_images(article_text: str, images_json: list[dict], model_id: str = None, text_config: dict = None):
@@ -266,14 +654,22 @@ def summarize_and_select_images(article_text: str, images_json: list[dict], mode
     try:
         # ----------------------------------------
         # Generate suitable caption/title for each image (defensive)
-        # Collect S3 URIs (skip missing ones but preserve order)
+        # Collect S3 URIs (skip missing ones but preserve order). Images that
+        # already have a caption and title aren't sent, and an image repeated
+        # on the page is captioned once.
         s3_images = []
-        idx_map = []  # maps caption index -> images_json index
+        idx_map = []  # maps caption index -> images_json indices
+        uri_pos = {}
         for i, image in enumerate(images_json):
+            if image.get("caption") and image.get("title"):
+                continue
             s3_uri = image.get("s3_url") or image.get("s3_uri") or image.get("presigned_url")
-            if s3_uri:
+            if s3_uri in uri_pos:
+                idx_map[uri_pos[s3_uri]].append(i)
+            elif s3_uri:
+                uri_pos[s3_uri] = len(s3_images)
                 s3_images.append(s3_uri)
-                idx_map.append(i)
+                idx_map.append([i])
             else:
                 # Leave existing caption/title in place if present
                 logger.debug(f"Image at index {i} has no s3_url/presigned_url; skipping caption generation")
@@ -282,8 +678,9 @@ def summarize_and_select_images(article_text: str, images_json: list[dict], mode
         titles = []
         try:
             if s3_images:
-                captions = batch_caption_s3_images(s3_images, _CAPTION_MODE)
-                titles = batch_caption_s3_images(s3_images, _TITLE_MODE)
+                # Captions and titles are generated concurrently, each image downloaded once
+                results = batch_multi_mode_s3_images(s3_images, (_CAPTION_MODE, _TITLE_MODE))
+                captions, titles = results[_CAPTION_MODE], results[_TITLE_MODE]
                 # Log summary of caption/title generation for debugging
                 try:
                     success_captions = sum(1 for c in captions if isinstance(c, dict) and c.get("result"))
@@ -298,24 +695,22 @@ def summarize_and_select_images(article_text: str, images_json: list[dict], mode
                         cap_preview = (cap.get("result")[:200] + "...") if cap_ok and len(cap.get("result")) > 200 else (cap.get("result") if cap_ok else None)
                         tit_preview = (tit.get("result")[:200] + "...") if tit_ok and len(tit.get("result")) > 200 else (tit.get("result") if tit_ok else None)
                         logger.info(f"Caption/title for {s3}: caption_ok={bool(cap_ok)} title_ok={bool(tit_ok)} caption_preview={cap_preview} title_preview={tit_preview}")
-                        # Also print debug lines to CloudWatch to help tracing
-                        try:
-                            print(json.dumps({
+                        # Structured copy for CloudWatch tracing; only serialized when debugging
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("caption/title: %s", json.dumps({
                                 "s3": s3,
                                 "caption_ok": bool(cap_ok),
                                 "title_ok": bool(tit_ok),
                                 "caption_preview": cap_preview,
                                 "title_preview": tit_preview
                             }, ensure_ascii=False))
-                        except Exception:
-                            pass
                 except Exception:
                     logger.debug("Failed to log caption/title summary", exc_info=True)
         except Exception as e:
-            logger.warning(f"batch_caption_s3_images failed: {str(e)}")
+            logger.warning(f"batch_multi_mode_s3_images failed: {str(e)}")
 
         # Apply results back into images_json, being defensive about missing keys
-        for j, orig_idx in enumerate(idx_map):
+        for j, orig_indices in enumerate(idx_map):
             cap_entry = captions[j] if j < len(captions) else None
             title_entry = titles[j] if j < len(titles) else None
 
@@ -333,15 +728,12 @@ def summarize_and_select_images(article_text: str, images_json: list[dict], mode
             elif isinstance(title_entry, dict) and title_entry.get("error"):
                 logger.warning(f"Title generation error for {title_entry.get('s3_uri')}: {title_entry.get('error')}")
 
-            # Fallbacks: keep existing values or empty string
-            if caption_text is None:
-                caption_text = images_json[orig_idx].get("caption") or ""
-            if title_text is None:
-                title_text = images_json[orig_idx].get("title") or ""
-
-            images_json[orig_idx]["caption"] = caption_text
-            images_json[orig_idx]["title"] = title_text
-            images_json[orig_idx]["tags"] = images_json[orig_idx].get("tags", []) or []
+            for orig_idx in orig_indices:
+                image = images_json[orig_idx]
+                # Fallbacks: keep existing values or empty string
+                image["caption"] = caption_text if caption_text is not None else image.get("caption") or ""
+                image["title"] = title_text if title_text is not None else image.get("title") or ""
+                image["tags"] = image.get("tags", []) or []
 
         # ----------------------------------------
         # Allow callers to override the per-bullet max word count via text_config.
@@ -362,43 +754,21 @@ def summarize_and_select_images(article_text: str, images_json: list[dict], mode
         # Resolve num_bullets from text_config only
         num_bullets = (text_config or {}).get('num_bullets', DEFAULT_NUM_BULLETS)
 
-        prompt = f"""You are given a long article and a list of candidate images (each includes title, caption/tags, and an S3 URL).
-        Tasks:
-        1) Produce {num_bullets} main bullet points summarizing the core ideas of the article (≤{max_words_per_bullet} words each, no overlap).
-        2) For each bullet point, select at most three best-matching images from the provided list.
-        3) If there are no suitable images, return empty images and do not invent images.
-        4) Return a valid JSON object with this schema:
-        {{
-          "bullets": [
-            {{
-              "text": "<<= {max_words_per_bullet} words>>",
-              "reason": "<<why this image fits, 1 sentence>>",
-              "image_url": "<<a list of suitable provided images in s3 URLs>>"
-            }}
-          ]
-        }}
-
-        Important rules:
-        - Base your image choice ONLY on the provided image titles/captions/tags (no external fetching).
-        - Output JSON only. No markdown. No explanations outside JSON.
-
-        ARTICLE:
-        <<<
-        {article_text}
-        >>>
-
-        IMAGES:
-        <<<
-        {json.dumps(images_json, ensure_ascii=False)}
-        >>>
-        """
-
-        # We need to construct the request body according to the target model's
-        # expected schema. Anthropic/Claude models accept a `messages` style
-        # request (and optional "anthropic_version"/"max_tokens"), while
-        # Amazon Titan models expect an `inputText` + `textGenerationConfig`.
-        # Build per-model bodies inside the loop so we don't send the wrong
-        # schema and trigger ValidationException (schema violations).
+        # Built once and shared by every model attempt below. Compact
+        # separators: the images JSON is model input, whitespace costs tokens.
+        # Instructions + images come first so they can be served from the
+        # prompt cache when the same page is summarized again.
+        prompt = "".join((
+            _image_selection_prompt(num_bullets, max_words_per_bullet),
+            "\nIMAGES:\n<<<\n",
+            _json.dumps(images_json),
+            "\n>>>\n",
+        ))
+        article = "".join(("\nARTICLE:\n<<<\n", article_text, "\n>>>\n"))
+
+        # The Converse API takes the same request for Claude and Titan models,
+        # so every fallback below shares one inference config
+        inference_config = _inference_config(text_config if isinstance(text_config, dict) else {}, 0.2)
 
         # allow caller-provided model_id; otherwise use fallback list
         try_models = []
@@ -420,52 +790,23 @@ def summarize_and_select_images(article_text: str, images_json: list[dict], mode
         # Remove duplicates while preserving order
         seen = set()
         try_models = [m for m in try_models if m and m not in seen and not seen.add(m)]
+        # Skip fallbacks a recent probe found denied, so an AccessDenied round-trip
+        # isn't paid before the first usable model. The caller's model and the
+        # profile ARN are never probed, so they are always kept.
+        accessible = _known_accessible_models()
+        if accessible:
+            try_models = [
+                m for m in try_models
+                if m in accessible or m == model_id or m == CLAUDE_INFERENCE_PROFILE
+            ] or try_models
 
         last_exc = None
         out = None
+        reprobed = False
         for try_model in try_models:
             try:
-                # Prepare a model-specific request body
-                model_body = None
-                # Merge caller-provided text_config into generated config when present
-                cfg = {}
-                if isinstance(text_config, dict):
-                    cfg = text_config.copy()
-
-                if "anthropic" in (try_model or "") or "claude" in (try_model or ""):
-                    # Anthropic-style schema
-                    model_body = {
-                        "anthropic_version": cfg.get("anthropic_version", "bedrock-2023-05-31"),
-                        "max_tokens": cfg.get("max_tokens") or cfg.get("max_tokens", cfg.get("maxTokenCount", 8192)),
-                        "temperature": cfg.get("temperature", 0.2),
-                        "messages": [
-                            {"role": "user", "content": prompt}
-                        ]
-                    }
-                else:
-                    # Amazon Titan / generic Bedrock text schema
-                    text_gen_cfg = {
-                        "maxTokenCount": cfg.get("maxTokenCount", cfg.get("max_tokens", 8192)),
-                        "temperature": cfg.get("temperature", 0.2)
-                    }
-                    model_body = {
-                        "inputText": prompt,
-                        "textGenerationConfig": text_gen_cfg
-                    }
-
-                # Log a truncated preview of the body to aid debugging schema issues
-                try:
-                    logger.debug(f"Invoking model {try_model} with request body preview: {json.dumps(model_body)[:1000]}")
-                except Exception:
-                    pass
-
-                res = bedrock_client.invoke_model(
-                    modelId=try_model,
-                    contentType="application/json",
-                    accept="application/json",
-                    body=json.dumps(model_body)
-                )
-                out = json.loads(res["body"].read())
+                logger.debug(f"Invoking model {try_model} with inference config {inference_config}")
+                out = _converse(try_model, article, inference_config, cached_prefix=prompt)["output"]["message"]
                 break
             except ClientError as ex:
                 last_exc = ex
@@ -473,6 +814,9 @@ def summarize_and_select_images(article_text: str, images_json: list[dict], mode
                 err = ex.response.get('Error', {}) if hasattr(ex, 'response') else {}
                 logger.warning(f"Model {try_model} ClientError: Code={err.get('Code')} Message={err.get('Message')}")
                 logger.debug("Full ClientError response for model %s: %s", try_model, getattr(ex, 'response', str(ex)))
+                if err.get('Code') not in _FALLBACK_ERRORS:
+                    # Throttling/5xx survived botocore's retries; other models share the same quota
+                    raise
 
                 # If validation mentions inference profile, try to discover accessible models
                 msg = str(ex)
@@ -481,6 +825,10 @@ def summarize_and_select_images(article_text: str, images_json: list[dict], mode
                         accessible = []
                         try:
                             accessible = check_model_access()
+                            # Everything the cached probe reported was already tried; it may be stale
+                            if not reprobed and all(m in try_models for m in accessible):
+                                reprobed = True
+                                accessible = check_model_access(force=True)
                         except Exception:
                             accessible = []
                         # try accessible models not already attempted
@@ -488,29 +836,7 @@ def summarize_and_select_images(article_text: str, images_json: list[dict], mode
                             if m in try_models:
                                 continue
                             try:
-                                # Build body for the accessible model as well
-                                model_body = None
-                                if "anthropic" in (m or "") or "claude" in (m or ""):
-                                    model_body = {
-                                        "anthropic_version": (text_config or {}).get("anthropic_version", "bedrock-2023-05-31"),
-                                        "max_tokens": (text_config or {}).get("max_tokens", (text_config or {}).get("maxTokenCount", 8192)),
-                                        "temperature": (text_config or {}).get("temperature", 0.2),
-                                        "messages": [{"role": "user", "content": prompt}]
-                                    }
-                                else:
-                                    text_gen_cfg = {
-                                        "maxTokenCount": (text_config or {}).get("maxTokenCount", (text_config or {}).get("max_tokens", 8192)),
-                                        "temperature": (text_config or {}).get("temperature", 0.2)
-                                    }
-                                    model_body = {"inputText": prompt, "textGenerationConfig": text_gen_cfg}
-
-                                res = bedrock_client.invoke_model(
-                                    modelId=m,
-                                    contentType="application/json",
-                                    accept="application/json",
-                                    body=json.dumps(model_body)
-                                )
-                                out = json.loads(res["body"].read())
+                                out = _converse(m, article, inference_config, cached_prefix=prompt)["output"]["message"]
                                 try_model = m
                                 last_exc = None
                                 break
@@ -544,16 +870,17 @@ def summarize_and_select_images(article_text: str, images_json: list[dict], mode
                 except Exception:
                     pass
                 raise last_exc
-        # bedrock may return text in out['content'][0]['text'] as a JSON string
+        # Converse returns the message as {"role", "content": [{"text": ...}]};
+        # the text may be a JSON string
         content_arr = out.get("content") or []
 
         # If no content was returned by the model, try the simpler
-        # summarize_page path as a fallback (this uses the alternate
-        # Titan/text schema and may succeed where the current call failed).
+        # summarize_page path as a fallback (it has its own model list
+        # and may succeed where the current call failed).
         if not content_arr:
             logger.warning("No content returned from model in summarize_and_select_images; attempting summarize_page fallback")
             try:
-                sp_resp = summarize_page(content_page=article_text, text_config=text_config or {}, model_id=model_id)
+                sp_resp = summarize_page(content_page=article_text, text_config=text_config, model_id=model_id)
                 # sp_resp is typically {"result": {...}, "model_used": ...}
                 if isinstance(sp_resp, dict):
                     # Try to extract output text from result or top-level
@@ -575,79 +902,22 @@ def summarize_and_select_images(article_text: str, images_json: list[dict], mode
         else:
             text_field = content_arr[0].get("text", "")
         # Try to parse the text as JSON, but be defensive
-        def _enrich_bullets(bullets_list, images_list):
-            if not isinstance(bullets_list, list):
-                return bullets_list
-            try:
-                # build quick index by possible url keys
-                idx_map = {}
-                for img in images_list or []:
-                    # prefer s3_url, then presigned_url, then source_url
-                    for key in ("s3_url", "presigned_url", "source_url"):
-                        val = img.get(key)
-                        if val:
-                            idx_map[val] = img
-
-                enriched = []
-                for b in bullets_list:
-                    try:
-                        if not isinstance(b, dict):
-                            enriched.append(b)
-                            continue
-                        imgs = b.get("image_url")
-                        if not imgs:
-                            enriched.append(b)
-                            continue
-                        # normalize to list
-                        if isinstance(imgs, str):
-                            imgs_list = [imgs]
-                        elif isinstance(imgs, list):
-                            imgs_list = imgs
-                        else:
-                            enriched.append(b)
-                            continue
-
-                        new_imgs = []
-                        for u in imgs_list:
-                            if not isinstance(u, str):
-                                new_imgs.append(u)
-                                continue
-                            meta = idx_map.get(u)
-                            if meta:
-                                new_imgs.append({
-                                    "image_url": u,
-                                    "title": meta.get("title") or None,
-                                    "caption": meta.get("caption") or None,
-                                    "tags": meta.get("tags") or [],
-                                })
-                            else:
-                                # fallback: include original URL string
-                                new_imgs.append({"image_url": u})
-
-                        nb = dict(b)
-                        nb["image_url"] = new_imgs
-                        enriched.append(nb)
-                    except Exception:
-                        enriched.append(b)
-                return enriched
-            except Exception:
-                return bullets_list
+        # One index for whichever enrichment path below succeeds
+        idx_map = _image_index(images_json)
 
         try:
-            parsed = json.loads(text_field)
+            parsed = _json.loads(text_field)
             bullets = parsed.get("bullets", [])
-            return _enrich_bullets(bullets, images_json)
+            return _enrich_bullets(bullets, idx_map)
         except Exception:
-            # If text_field itself isn't JSON, try to extract inline JSON from it
+            # If text_field itself isn't JSON, decode the first JSON object
+            # embedded in it (ignores prose or further blocks after it)
             try:
-                # find first `{` and last `}`
                 start = text_field.find("{")
-                end = text_field.rfind("}")
-                if start != -1 and end != -1 and end > start:
-                    candidate = text_field[start:end+1]
-                    parsed = json.loads(candidate)
+                if start != -1:
+                    parsed, _ = _JSON_DECODER.raw_decode(text_field, start)
                     bullets = parsed.get("bullets", [])
-                    return _enrich_bullets(bullets, images_json)
+                    return _enrich_bullets(bullets, idx_map)
             except Exception:
                 pass
 
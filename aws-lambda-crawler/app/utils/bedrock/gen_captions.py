@@ -1,14 +1,34 @@
+import asyncio
+import atexit
+import hashlib
+import io
+import logging
 import os
-import json
-import base64
 import mimetypes
+import re
+import threading
 from typing import List, Dict, Tuple, Optional
 import concurrent.futures as cf
+from collections import OrderedDict
+from functools import lru_cache, partial
 
 import boto3
+from botocore.config import Config
 from botocore.exceptions import BotoCoreError, ClientError
-import urllib.request
-from urllib.error import URLError, HTTPError
+from requests import RequestException
+
+try:
+    from PIL import Image
+except ImportError:  # optional: images are then sent as downloaded
+    Image = None
+
+from app.utils.http import http_session
+
+logger = logging.getLogger(__name__)
+# Per-image and per-candidate messages are DEBUG; CAPTION_DEBUG=1 shows them
+if os.getenv("CAPTION_DEBUG") == "1":
+    logger.setLevel(logging.DEBUG)
+
 # --- Config ---
 BEDROCK_REGION = os.getenv("REGION", "ap-southeast-2")
 # Allow overriding the Claude model via env var. If not provided, try a list
@@ -28,10 +48,74 @@ CLAUDE_MODEL_CANDIDATES = [
     # Keep the problematic model last as a fallback (will likely fail without inference profile)
     "anthropic.claude-3-5-sonnet-20240620-v1:0",  # Claude 3.5 Sonnet (requires inference profile)
 ]
+# Configured candidates in order, without blanks or repeats
+CLAUDE_MODELS = tuple(dict.fromkeys(c for c in CLAUDE_MODEL_CANDIDATES if c))
+
+# Candidate that last produced a caption; tried first so later images
+# don't repeat the failed probes of the ones ahead of it
+_preferred_candidate = None
+
+# Threads of the shared caption pool (_EXECUTOR); every call is network-bound
+CAPTION_WORKERS = int(os.getenv("CAPTION_WORKERS", "8"))
 
-session = boto3.Session(region_name=BEDROCK_REGION)
-s3 = session.client("s3")
-runtime = session.client("bedrock-runtime")
+# One session and connection config for every S3/Bedrock client: keep-alive
+# connections and a pool large enough for the concurrent caption/title calls.
+BOTO_CONFIG = Config(
+    # Room for every caption worker plus the 16 summary threads (bedrock_runtime)
+    max_pool_connections=max(64, CAPTION_WORKERS + 16),
+    # Adaptive mode backs off with jitter and rate-limits on ThrottlingException
+    retries={"max_attempts": 6, "mode": "adaptive"},
+    connect_timeout=3,
+    read_timeout=60,
+    tcp_keepalive=True,
+)
+_clients_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _session():
+    return boto3.Session(region_name=BEDROCK_REGION)
+
+
+@lru_cache(maxsize=None)
+def _client(service):
+    return _session().client(service, config=BOTO_CONFIG)
+
+
+def boto_client(service: str):
+    """
+    Shared client for `service` ("s3", "bedrock-runtime", ...), created on first
+    use so importing this module stays cheap. Creation is serialized because
+    a boto3 session isn't thread-safe.
+    """
+    with _clients_lock:
+        return _client(service)
+
+# Shared by every batch so worker threads survive across invocations.
+# Downloads get their own pool so S3 GETs never queue behind model calls.
+_EXECUTOR = cf.ThreadPoolExecutor(max_workers=CAPTION_WORKERS)
+_FETCH_EXECUTOR = cf.ThreadPoolExecutor(max_workers=int(os.getenv("IMAGE_FETCH_WORKERS", "16")))
+atexit.register(_EXECUTOR.shutdown, wait=False)
+atexit.register(_FETCH_EXECUTOR.shutdown, wait=False)
+
+# Images captioned per model call; 1 disables batching
+CAPTION_BATCH_SIZE = max(1, int(os.getenv("CAPTION_BATCH_SIZE", "4")))
+# Images above this size are downscaled/recompressed before captioning;
+# 1568 px is the long edge Claude resizes to anyway
+_SHRINK_MIN_BYTES = 200_000
+_MAX_IMAGE_EDGE = 1568
+# Converse image formats named differently from their MIME subtype
+_IMAGE_FORMATS = {"jpg": "jpeg", "pjpeg": "jpeg", "x-png": "png"}
+# One "[i] text" line per image in a batched reply
+_BATCH_LINE_RE = re.compile(r"^\[(\d+)\]\s*(.+)$", re.MULTILINE)
+# Text wrapped in a matching pair of quotes
+_QUOTED_RE = re.compile(r"""^(['"])(.*)\1$""", re.DOTALL)
+
+# (image content digest, mode) -> generated text, kept across warm invocations
+# so the same picture behind different URIs is only captioned once
+_CAPTION_CACHE_SIZE = 512
+_caption_cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+_caption_cache_lock = threading.Lock()
 
 
 # --- Helpers ---
@@ -45,20 +129,19 @@ def parse_s3_uri(s3_uri: str) -> Tuple[str, str]:
     return bucket, key
 
 
-def s3_image_to_base64_and_type(s3_uri: str) -> Tuple[str, str]:
-    """Download image from S3, return (base64, media_type)."""
+def s3_image_to_bytes_and_type(s3_uri: str) -> Tuple[bytes, str]:
+    """
+    Download image from S3, return (bytes, media_type).
+    """
     # Support both s3:// URIs and presigned HTTP(S) URLs
     data = None
     content_type = ""
     try:
         if s3_uri.startswith("s3://"):
             bucket, key = parse_s3_uri(s3_uri)
-            try:
-                # Try to get ContentType from head
-                head = s3.head_object(Bucket=bucket, Key=key)
-                content_type = head.get("ContentType") or ""
-            except ClientError:
-                content_type = ""
+            # GetObject returns the ContentType too, so no separate HEAD request
+            obj = boto_client("s3").get_object(Bucket=bucket, Key=key)
+            content_type = obj.get("ContentType") or ""
 
             # Fallback: guess from file extension
             if not content_type or content_type == "binary/octet-stream":
@@ -66,33 +149,58 @@ def s3_image_to_base64_and_type(s3_uri: str) -> Tuple[str, str]:
                 if guessed:
                     content_type = guessed
 
-            # Read the file from S3
-            obj = s3.get_object(Bucket=bucket, Key=key)
+            # Read straight into one bytes object; no base64 copy is ever made
             data = obj["Body"].read()
         elif s3_uri.startswith("http://") or s3_uri.startswith("https://"):
             # Fetch via HTTP(S) (presigned URL or public URL)
             try:
-                with urllib.request.urlopen(s3_uri) as resp:
-                    # resp.info() is a mapping-like of headers
-                    ct = resp.info().get_content_type()
-                    if ct:
-                        content_type = ct
-                    data = resp.read()
-            except (HTTPError, URLError) as e:
+                resp = http_session().get(s3_uri, timeout=10)
+                resp.raise_for_status()
+                # Drop parameters such as "; charset=..."
+                ct = resp.headers.get("Content-Type", "").split(";")[0].strip()
+                if ct:
+                    content_type = ct
+                data = resp.content
+            except RequestException as e:
                 raise ValueError(f"Failed to fetch URL {s3_uri}: {e}")
         else:
             raise ValueError(f"Unsupported URI scheme for image: {s3_uri}")
     except Exception:
         # Re-raise to be handled by caller
         raise
-    b64 = base64.b64encode(data).decode("utf-8")
-
     # Normalize common types for Claude
     if not content_type:
         # default to png
         content_type = "image/png"
 
-    return b64, content_type
+    return shrink_image(data, content_type)
+
+
+def shrink_image(data: bytes, media_type: str) -> Tuple[bytes, str]:
+    """
+    Downscale a large image to _MAX_IMAGE_EDGE px on its long edge and
+    re-encode it as JPEG, so it costs fewer input tokens and bytes on the wire.
+    Small images, and every image when Pillow isn't installed, pass through.
+    """
+    if Image is None or len(data) < _SHRINK_MIN_BYTES:
+        return data, media_type
+    try:
+        im = Image.open(io.BytesIO(data))
+        im.thumbnail((_MAX_IMAGE_EDGE, _MAX_IMAGE_EDGE))
+        if im.mode in ("RGBA", "LA", "P"):
+            # Flatten transparency onto white; dark diagrams would vanish on black
+            im = im.convert("RGBA")
+            background = Image.new("RGB", im.size, (255, 255, 255))
+            background.paste(im, mask=im.getchannel("A"))
+            im = background
+        buf = io.BytesIO()
+        im.convert("RGB").save(buf, "JPEG", quality=85, optimize=True)
+    except Exception as ex:
+        logger.debug("Could not shrink %s image, sending it unchanged: %s", media_type, ex)
+        return data, media_type
+    if buf.tell() >= len(data):
+        return data, media_type
+    return buf.getvalue(), "image/jpeg"
 
 
 def build_prompt(mode: str = "caption") -> str:
@@ -114,41 +222,48 @@ def build_prompt(mode: str = "caption") -> str:
     )
 
 
-def claude_caption_single(image_b64: str, media_type: str, mode: str = "caption", max_tokens: int = 120) -> str:
-    prompt = build_prompt(mode)
-    body_template = {
-        "anthropic_version": "bedrock-2023-05-31",
-        "max_tokens": max_tokens,
-        "temperature": 0.2,
-        "messages": [
-            {
-                "role": "user",
-                "content": [
-                    {"type": "text", "text": prompt},
-                    {"type": "image", "source": {"type": "base64", "media_type": media_type, "data": image_b64}},
-                ],
-            }
-        ],
-    }
+def build_batch_prompt(mode: str, count: int) -> str:
+    """
+    Prompt for `count` images labelled [1]..[count] in a single request.
+    """
+    return (
+        build_prompt(mode).replace("the image", "each image")
+        + f"Return exactly {count} lines, one per image, formatted as: [i] <text>\n"
+    )
+
+
+def _strip_quotes(text: str) -> str:
+    # sanitize a bit: remove surrounding quotes if LLM adds them
+    text = text.strip()
+    m = _QUOTED_RE.match(text)
+    return m.group(2).strip() if m else text
+
+
+def _invoke_claude(content: List[Dict], max_tokens: int) -> str:
+    """
+    Send one user message (Converse content blocks) to the first Claude
+    candidate that accepts it and return the reply text.
+    """
+    messages = [{"role": "user", "content": content}]
+    inference_config = {"maxTokens": max_tokens, "temperature": 0.2}
+
+    global _preferred_candidate
+    candidates = CLAUDE_MODELS
+    if _preferred_candidate and _preferred_candidate != candidates[0]:
+        candidates = (_preferred_candidate,) + tuple(c for c in candidates if c != _preferred_candidate)
 
     last_exc = None
-    for candidate in CLAUDE_MODEL_CANDIDATES:
-        if not candidate:
-            continue
-        print(f"Trying Claude model candidate: {candidate}")
+    for candidate in candidates:
+        logger.debug("Trying Claude model candidate: %s", candidate)
         try:
-            resp = runtime.invoke_model(
+            resp = boto_client("bedrock-runtime").converse(
                 modelId=candidate,
-                contentType="application/json",
-                accept="application/json",
-                body=json.dumps(body_template),
+                messages=messages,
+                inferenceConfig=inference_config,
             )
-            out = json.loads(resp["body"].read())
-            text = out["content"][0]["text"].strip()
-            # sanitize a bit: remove surrounding quotes if LLM adds them
-            if (text.startswith('"') and text.endswith('"')) or (text.startswith("'") and text.endswith("'")):
-                text = text[1:-1].strip()
-            print(f"✓ Successfully used Claude model: {candidate}")
+            text = resp["output"]["message"]["content"][0]["text"].strip()
+            logger.debug("Successfully used Claude model: %s", candidate)
+            _preferred_candidate = candidate
             return text
         except ClientError as ex:
             last_exc = ex
@@ -157,76 +272,231 @@ def claude_caption_single(image_b64: str, media_type: str, mode: str = "caption"
             code = err.get('Error', {}).get('Code') if isinstance(err, dict) else None
             msg = str(ex)
             if code == 'ValidationException' and ('inference profile' in msg or 'Invocation of model ID' in msg):
-                print(f"⚠️ Model {candidate} requires inference profile, trying next candidate")
+                logger.warning("Model %s requires inference profile, trying next candidate", candidate)
                 # try next candidate
                 continue
             # For other client errors, also try next candidate
-            print(f"✗ Model {candidate} failed: {code} - {msg}")
+            logger.warning("Model %s failed: %s - %s", candidate, code, msg)
             continue
     # If we exhausted candidates, raise the last exception
     if last_exc:
         raise last_exc
     raise RuntimeError("No Claude model candidates configured")
-    # sanitize a bit: remove surrounding quotes if LLM adds them
-    if (text.startswith('"') and text.endswith('"')) or (text.startswith("'") and text.endswith("'")):
-        text = text[1:-1].strip()
-    return text
 
 
-def caption_or_title_for_s3_image(s3_uri: str, mode: str = "caption") -> Dict[str, str]:
-    """Process a single image S3 URI and return dict with result."""
-    print(f"[caption] Starting {mode} for: {s3_uri}")
+def _image_block(data: bytes, media_type: str) -> Dict:
+    # Converse takes the raw bytes, so images are never base64-encoded here
+    image_format = media_type.split("/")[-1].lower()
+    return {"image": {"format": _IMAGE_FORMATS.get(image_format, image_format), "source": {"bytes": data}}}
+
+
+def claude_caption_single(data: bytes, media_type: str, mode: str = "caption", max_tokens: int = 120) -> str:
+    content = [
+        {"text": build_prompt(mode)},
+        _image_block(data, media_type),
+    ]
+    return _strip_quotes(_invoke_claude(content, max_tokens))
+
+
+def claude_caption_batch(images: List[Tuple[bytes, str]], mode: str = "caption") -> Dict[int, str]:
+    """
+    Caption (or title) several (bytes, media_type) images with one model call.
+    Returns {1-based index: text}; images the reply skipped are missing.
+    """
+    content: List[Dict] = []
+    for i, (data, media_type) in enumerate(images, 1):
+        content.append({"text": f"[{i}]"})
+        content.append(_image_block(data, media_type))
+    content.append({"text": build_batch_prompt(mode, len(images))})
+    text = _invoke_claude(content, max_tokens=60 * len(images))
+    texts = {}
+    for m in _BATCH_LINE_RE.finditer(text):
+        idx = int(m.group(1))
+        if 1 <= idx <= len(images):
+            texts[idx] = _strip_quotes(m.group(2))
+    return texts
+
+
+def caption_or_title_for_s3_image(
+    s3_uri: str,
+    mode: str = "caption",
+    image: Optional[Tuple[bytes, str]] = None,
+) -> Dict[str, str]:
+    """Process a single image S3 URI (or its already downloaded (bytes, media_type)) and return dict with result."""
+    logger.debug("[caption] Starting %s for: %s", mode, s3_uri)
     try:
-        b64, media_type = s3_image_to_base64_and_type(s3_uri)
-        # b64 length gives an approximate size indicator
-        print(f"[caption] Fetched {s3_uri}: media_type={media_type} base64_len={len(b64)}")
-        result = claude_caption_single(b64, media_type, mode=mode)
-        # Log a preview of the generated text
-        preview = result[:200] + "..." if isinstance(result, str) and len(result) > 200 else result
-        print(f"[caption] SUCCESS {mode} for {s3_uri}: {preview}")
+        data, media_type = image or s3_image_to_bytes_and_type(s3_uri)
+        logger.debug("[caption] Fetched %s: media_type=%s bytes=%d", s3_uri, media_type, len(data))
+        result = claude_caption_single(data, media_type, mode=mode)
+        if logger.isEnabledFor(logging.DEBUG):
+            # Log a preview of the generated text
+            preview = result[:200] + "..." if isinstance(result, str) and len(result) > 200 else result
+            logger.debug("[caption] SUCCESS %s for %s: %s", mode, s3_uri, preview)
         return {"s3_uri": s3_uri, "result": result, "mode": mode}
     except (BotoCoreError, ClientError, ValueError) as e:
-        print(f"[caption] FETCH/CLIENT error for {s3_uri}: {e}")
+        logger.warning("[caption] FETCH/CLIENT error for %s: %s", s3_uri, e)
         return {"s3_uri": s3_uri, "error": str(e), "mode": mode}
     except Exception as ex:
-        print(f"[caption] Unexpected error for {s3_uri}: {ex}")
+        logger.warning("[caption] Unexpected error for %s: %s", s3_uri, ex)
         return {"s3_uri": s3_uri, "error": str(ex), "mode": mode}
 
 
 def batch_caption_s3_images(
     s3_uris: List[str],
-    mode: str = "caption",
-    max_workers: int = 2
+    mode: str = "caption"
 ) -> List[Dict[str, str]]:
     """
     Process a list of s3:// URIs concurrently.
     mode: "caption" or "title"
     Returns list of dicts in the SAME ORDER as input.
     """
-    # We want to preserve order; map futures to index
-    results: List[Optional[Dict[str, str]]] = [None] * len(s3_uris)
-    print(f"[batch_caption] Starting batch of {len(s3_uris)} images mode={mode} workers={max_workers}")
-    with cf.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_idx = {
-            executor.submit(caption_or_title_for_s3_image, s3_uri, mode): i
-            for i, s3_uri in enumerate(s3_uris)
-        }
-        for fut in cf.as_completed(future_to_idx):
-            idx = future_to_idx[fut]
-            try:
-                results[idx] = fut.result()
-            except Exception as e:
-                results[idx] = {"s3_uri": s3_uris[idx], "error": str(e), "mode": mode}
+    return batch_multi_mode_s3_images(s3_uris, (mode,))[mode]
+
+
+def _image_digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _cached_caption(key: Tuple[str, str]) -> Optional[str]:
+    with _caption_cache_lock:
+        text = _caption_cache.get(key)
+        if text is not None:
+            _caption_cache.move_to_end(key)
+        return text
+
+
+def _cache_caption(key: Tuple[str, str], text: str) -> None:
+    with _caption_cache_lock:
+        _caption_cache[key] = text
+        _caption_cache.move_to_end(key)
+        if len(_caption_cache) > _CAPTION_CACHE_SIZE:
+            _caption_cache.popitem(last=False)
+
+
+def _caption_chunk(s3_uris: List[str], images: List[Tuple[bytes, str]], mode: str) -> List[Dict[str, str]]:
+    """
+    Caption/title a chunk of downloaded images with a single model call.
+    Images the batched reply doesn't cover fall back to one call each.
+    """
+    texts: Dict[int, str] = {}
+    if len(s3_uris) > 1:
+        try:
+            texts = claude_caption_batch(images, mode)
+        except Exception as ex:
+            logger.warning("[caption] Batched %s for %d images failed, captioning one by one: %s", mode, len(s3_uris), ex)
+        if len(texts) < len(s3_uris):
+            logger.info("[caption] Batched %s covered %d/%d images", mode, len(texts), len(s3_uris))
+    return [
+        {"s3_uri": s3_uri, "result": texts[i], "mode": mode} if i in texts
+        else caption_or_title_for_s3_image(s3_uri, mode, image)
+        for i, (s3_uri, image) in enumerate(zip(s3_uris, images), 1)
+    ]
+
+
+def batch_multi_mode_s3_images(
+    s3_uris: List[str],
+    modes: Tuple[str, ...] = ("caption", "title")
+) -> Dict[str, List[Dict[str, str]]]:
+    """
+    Download every image on the fetch pool and, as soon as CAPTION_BATCH_SIZE
+    of them are in, caption/title that chunk on the model pool. Downloads
+    overlap model calls, captions and titles run at the same time, and each
+    model call covers several images. Images whose bytes were already
+    captioned (in this batch or a recent one) are not sent again.
+    Returns {mode: list of dicts in the SAME ORDER as input}.
+    """
+    logger.info("[batch_caption] Starting batch of %d images modes=%s", len(s3_uris), modes)
+    # Each distinct image is downloaded once and shared by every mode
+    unique = list(dict.fromkeys(s3_uris))
+    fetch_to_uri = {_FETCH_EXECUTOR.submit(s3_image_to_bytes_and_type, s3_uri): s3_uri for s3_uri in unique}
+
+    by_uri: Dict[str, Dict[str, Dict[str, str]]] = {mode: {} for mode in modes}
+    digest_of: Dict[str, str] = {}
+    # digest -> the URI whose result stands for every URI with those bytes
+    first_uri: Dict[str, str] = {}
+    future_to_chunk = {}
+    pending: Dict[str, List[Tuple[str, Tuple[bytes, str]]]] = {mode: [] for mode in modes}
+
+    def submit_pending(mode):
+        chunk = [u for u, _ in pending[mode]]
+        images = [image for _, image in pending[mode]]
+        future_to_chunk[_EXECUTOR.submit(_caption_chunk, chunk, images, mode)] = (mode, chunk)
+        pending[mode] = []
+
+    for fut in cf.as_completed(fetch_to_uri):
+        s3_uri = fetch_to_uri[fut]
+        try:
+            image = fut.result()
+        except Exception as e:
+            logger.warning("[caption] FETCH error for %s: %s", s3_uri, e)
+            for mode in modes:
+                by_uri[mode][s3_uri] = {"s3_uri": s3_uri, "error": str(e), "mode": mode}
+            continue
+        digest = digest_of[s3_uri] = _image_digest(image[0])
+        if digest in first_uri:
+            continue
+        first_uri[digest] = s3_uri
+        for mode in modes:
+            cached = _cached_caption((digest, mode))
+            if cached is not None:
+                by_uri[mode][s3_uri] = {"s3_uri": s3_uri, "result": cached, "mode": mode}
+                continue
+            pending[mode].append((s3_uri, image))
+            if len(pending[mode]) == CAPTION_BATCH_SIZE:
+                submit_pending(mode)
+    for mode in modes:
+        if pending[mode]:
+            submit_pending(mode)
+
+    for fut in cf.as_completed(future_to_chunk):
+        mode, chunk = future_to_chunk[fut]
+        try:
+            chunk_results = fut.result()
+        except Exception as e:
+            chunk_results = [{"s3_uri": s3_uri, "error": str(e), "mode": mode} for s3_uri in chunk]
+        for s3_uri, result in zip(chunk, chunk_results):
+            by_uri[mode][s3_uri] = result
+            if result.get("result"):
+                _cache_caption((digest_of[s3_uri], mode), result["result"])
+    # Duplicates get their own copy of the shared result, under their own URI
+    results = {
+        mode: [
+            dict(by_uri[mode][first_uri.get(digest_of.get(s3_uri), s3_uri)], s3_uri=s3_uri)
+            for s3_uri in s3_uris
+        ]
+        for mode in modes
+    }
     # Log summary
     try:
-        success = sum(1 for r in results if isinstance(r, dict) and r.get("result"))
-        errors = sum(1 for r in results if isinstance(r, dict) and r.get("error"))
-        print(f"[batch_caption] Completed: success={success} errors={errors} total={len(s3_uris)}")
+        for mode, mode_results in results.items():
+            success = sum(1 for r in mode_results if isinstance(r, dict) and r.get("result"))
+            errors = sum(1 for r in mode_results if isinstance(r, dict) and r.get("error"))
+            logger.info("[batch_caption] Completed %s: success=%d errors=%d total=%d", mode, success, errors, len(s3_uris))
     except Exception:
         pass
     return results
 
 
+async def batch_multi_mode_s3_images_async(
+    s3_uris: List[str],
+    modes: Tuple[str, ...] = ("caption", "title")
+) -> Dict[str, List[Dict[str, str]]]:
+    """
+    Awaitable `batch_multi_mode_s3_images`. Downloads and model calls already
+    run on the module's pools; only the thread waiting on them leaves the
+    event loop (the default executor, so it never takes a caption worker).
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, partial(batch_multi_mode_s3_images, s3_uris, modes))
+
+
+async def batch_caption_s3_images_async(s3_uris: List[str], mode: str = "caption") -> List[Dict[str, str]]:
+    """
+    Awaitable `batch_caption_s3_images`.
+    """
+    return (await batch_multi_mode_s3_images_async(s3_uris, (mode,)))[mode]
+
+
 if __name__ == "__main__":
     images = [
         "s3://bytescribeteam/application_diagram.png",
@@ -234,13 +504,13 @@ if __name__ == "__main__":
     ]
 
     # 1) Get caption
-    captions = batch_caption_s3_images(images, mode="caption", max_workers=4)
+    captions = batch_caption_s3_images(images, mode="caption")
     print("\n------------ caption -------------")
     for caption in captions:
         print(caption)
 
     # 2) Get title
-    titles = batch_caption_s3_images(images, mode="title", max_workers=4)
+    titles = batch_caption_s3_images(images, mode="title")
     print("\n------------ title -------------")
     for title in titles:
         print(title)
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""
+Semantic cache for page summaries: a page whose embedding is close enough to
+one summarized earlier reuses that summary instead of calling the model again.
+
+Enabled with SEMANTIC_CACHE=1. Entries live in SQLite under /tmp, so they
+survive warm invocations of the same Lambda container.
+"""
+import hashlib
+import json
+import logging
+import operator
+import os
+import sqlite3
+import threading
+from array import array
+from functools import lru_cache
+
+from . import _json
+from .gen_captions import boto_client
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.getenv("SEMANTIC_CACHE", "").lower() in ("1", "true", "yes")
+
+_EMBED_MODEL_ID = "amazon.titan-embed-text-v2:0"
+_CACHE_PATH = os.getenv("SEMANTIC_CACHE_PATH", "/tmp/summary_semantic_cache.sqlite3")
+# Cosine similarity above which two pages count as the same article
+_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+# Titan v2 takes up to 8k tokens; the head of a page identifies it well enough
+_EMBED_MAX_CHARS = 20000
+# Lookups scan every entry of a namespace, so keep the table small
+_MAX_ENTRIES = 2000
+
+_db_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _get_db():
+    db = sqlite3.connect(_CACHE_PATH, check_same_thread=False)
+    db.execute("CREATE TABLE IF NOT EXISTS summaries (namespace TEXT, vec BLOB, result TEXT)")
+    db.execute("CREATE INDEX IF NOT EXISTS summaries_namespace ON summaries (namespace)")
+    return db
+
+
+def _embed(text):
+    resp = boto_client("bedrock-runtime").invoke_model(
+        modelId=_EMBED_MODEL_ID,
+        contentType="application/json",
+        accept="application/json",
+        # Unit-length vectors, so cosine similarity is a plain dot product
+        body=_json.dumpb({"inputText": text[:_EMBED_MAX_CHARS], "normalize": True}),
+    )
+    return array("f", _json.loads(resp["body"].read())["embedding"])
+
+
+def namespace(model_id, text_config):
+    """
+    Cache namespace for a model and text config, so e.g. different bullet
+    counts never share entries.
+    """
+    key = json.dumps([model_id, dict(text_config)], sort_keys=True, default=str)
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def lookup(ns, text):
+    """
+    Return (cached result or None, embedding of `text`). The embedding is
+    handed back so a miss can be stored without embedding the page twice.
+    """
+    vec = _embed(text)
+    with _db_lock:
+        rows = _get_db().execute("SELECT vec, result FROM summaries WHERE namespace = ?", (ns,)).fetchall()
+    best_score, best = _THRESHOLD, None
+    for blob, result in rows:
+        score = sum(map(operator.mul, vec, array("f", blob)))
+        if score >= best_score:
+            best_score, best = score, result
+    if best is None:
+        return None, vec
+    logger.info(f"Semantic cache hit (similarity={best_score:.3f})")
+    return _json.loads(best), vec
+
+
+def store(ns, vec, result):
+    db = _get_db()
+    with _db_lock:
+        db.execute(
+            "INSERT INTO summaries (namespace, vec, result) VALUES (?, ?, ?)",
+            (ns, vec.tobytes(), _json.dumps(result)),
+        )
+        db.execute(
+            "DELETE FROM summaries WHERE rowid <= (SELECT MAX(rowid) FROM summaries) - ?",
+            (_MAX_ENTRIES,),
+        )
+        db.commit()
@@ -0,0 +1,29 @@
+"""
+Shared HTTP session for the crawler and the Bedrock helpers.
+"""
+from functools import lru_cache
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+@lru_cache(maxsize=None)
+def http_session(max_retries: int = 3, backoff: float = 0.3) -> requests.Session:
+    """Shared keep-alive session, so page, resource and image downloads reuse
+    connections (and TLS handshakes) across calls and warm invocations.
+    Connection errors, 429 and 5xx responses to GET/HEAD are retried with
+    exponential backoff; one session exists per retry policy."""
+    session = requests.Session()
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=backoff,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET", "HEAD"),
+        # Hand back the last response so callers' raise_for_status() reports it
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
@@ -1,10 +1,15 @@
 
+import hashlib
+import logging
 import os
+import threading
 import time
 import urllib.parse
 import urllib.robotparser
 from typing import Optional
 
+from app.utils.http import http_session
+from crawler.parser import HTML_PARSER
 from crawler.secrets import get_confluence_credentials
 
 import requests
@@ -14,38 +19,104 @@ from bs4 import BeautifulSoup
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, Tuple, List
 
+logger = logging.getLogger(__name__)
+
+
+# robots.txt bodies on disk, so a restarted runtime in the same container
+# doesn't fetch them again
+_ROBOTS_CACHE_DIR = os.getenv("ROBOTS_CACHE_DIR", "/tmp/robots")
+# Equivalent rules for hosts that refuse robots.txt or answer with a server
+# error (RobotFileParser disallows everything in both cases)
+_DISALLOW_ALL = "User-agent: *\nDisallow: /"
+# A failed robots.txt fetch is retried after this many seconds, not the full TTL
+_ROBOTS_RETRY_TTL = 60
+
 
 class RobotsChecker:
-    def __init__(self, user_agent: str = "aws-lambda-crawler"):
+    def __init__(self, user_agent: str = "aws-lambda-crawler", ttl: float = 3600):
         self.user_agent = user_agent
-        self._parsers: dict[str, urllib.robotparser.RobotFileParser] = {}
+        self.ttl = ttl
+        # base URL -> (parser or None, expires_at); shared by the download threads
+        self._parsers: dict[str, tuple[Optional[urllib.robotparser.RobotFileParser], float]] = {}
+        self._lock = threading.Lock()
+
+    def _cache_path(self, base: str) -> str:
+        return os.path.join(_ROBOTS_CACHE_DIR, hashlib.sha256(base.encode()).hexdigest() + ".txt")
+
+    def _robots_txt(self, base: str) -> Tuple[Optional[str], bool]:
+        """(rules for `base` or None if unknown, whether the rules can be cached),
+        from the disk cache or the host."""
+        path = self._cache_path(base)
+        try:
+            if time.time() - os.path.getmtime(path) < self.ttl:
+                with open(path, encoding="utf-8") as f:
+                    return f.read(), True
+        except OSError:
+            pass
+        robots_url = urllib.parse.urljoin(base, "/robots.txt")
+        try:
+            resp = http_session().get(robots_url, headers={"User-Agent": self.user_agent}, timeout=10)
+        except RequestException:
+            return None, False
+        if resp.status_code in (401, 403):
+            text = _DISALLOW_ALL
+        elif 400 <= resp.status_code < 500:
+            # No robots.txt: everything is allowed
+            text = ""
+        elif resp.ok:
+            text = resp.text
+        else:
+            # Server error: crawl nothing until robots.txt can be read again
+            return _DISALLOW_ALL, False
+        try:
+            os.makedirs(_ROBOTS_CACHE_DIR, exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+        return text, True
+
+    def _parser(self, base: str) -> Optional[urllib.robotparser.RobotFileParser]:
+        with self._lock:
+            cached = self._parsers.get(base)
+            if cached and cached[1] > time.monotonic():
+                return cached[0]
+        text, cacheable = self._robots_txt(base)
+        if text is None:
+            # If robots can't be fetched, assume allowed
+            rp = None
+        else:
+            rp = urllib.robotparser.RobotFileParser(urllib.parse.urljoin(base, "/robots.txt"))
+            rp.parse(text.splitlines())
+        ttl = self.ttl if cacheable else _ROBOTS_RETRY_TTL
+        with self._lock:
+            self._parsers[base] = (rp, time.monotonic() + ttl)
+        return rp
 
     def allowed(self, url: str) -> bool:
         parsed = urllib.parse.urlparse(url)
-        base = f"{parsed.scheme}://{parsed.netloc}"
-        rp = self._parsers.get(base)
-        if rp is None:
-            robots_url = urllib.parse.urljoin(base, "/robots.txt")
-            rp = urllib.robotparser.RobotFileParser()
-            try:
-                rp.set_url(robots_url)
-                rp.read()
-            except Exception:
-                # If robots can't be fetched, assume allowed
-                rp = None
-            self._parsers[base] = rp
-
+        rp = self._parser(f"{parsed.scheme}://{parsed.netloc}")
         if rp is None:
             return True
         return rp.can_fetch(self.user_agent, url)
 
 
+_USER_AGENT = "aws-lambda-crawler/1.0 (+https://example.com)"
+# Page resources larger than this, or of these types, are not downloaded
+MAX_RESOURCE_BYTES = int(os.getenv("MAX_RESOURCE_BYTES", str(4 * 1024 * 1024)))
+_SKIPPED_RESOURCE_TYPES = ("video/", "audio/")
+# Module-level so robots.txt is fetched once per host per warm container
+_robots = RobotsChecker(user_agent=_USER_AGENT)
+
+
 def fetch_html(url: str, timeout: int = 10, max_retries: int = 2, backoff: float = 1.0) -> Optional[str]:
     """Fetch HTML content from `url` with robots.txt respect, retries, and timeout.
 
     Returns HTML text on success or None on error / disallowed by robots.
     """
-    headers = {"User-Agent": "aws-lambda-crawler/1.0 (+https://example.com)"}
+    headers = {"User-Agent": _USER_AGENT}
     # Support optional Confluence authentication via Secrets Manager or environment variables:
     # - Preferred: store secret in AWS Secrets Manager and set CONFLUENCE_SECRET_NAME in env
     #   Secret should be JSON like {"user":"...","token":"..."} or {"bearer":"..."}
@@ -62,6 +133,8 @@ def fetch_html(url: str, timeout: int = 10, max_retries: int = 2, backoff: float
             auth = HTTPBasicAuth(user, token)
     parsed = urllib.parse.urlparse(url)
     base = f"{parsed.scheme}://{parsed.netloc}"
+    # Retries (with backoff) happen inside the session's adapter
+    session = http_session(max_retries, backoff)
 
     # Helper: try Confluence REST API for a page id (returns HTML string or None)
     def _try_confluence_rest_api() -> Optional[str]:
@@ -81,7 +154,7 @@ def fetch_html(url: str, timeout: int = 10, max_retries: int = 2, backoff: float
         headers_rest = headers.copy()
         headers_rest["Accept"] = "application/json"
         try:
-            resp = requests.get(api_url, headers=headers_rest, timeout=timeout, auth=auth)
+            resp = session.get(api_url, headers=headers_rest, timeout=timeout, auth=auth)
             resp.raise_for_status()
             data = resp.json()
             html = data.get("body", {}).get("view", {}).get("value")
@@ -101,10 +174,10 @@ def fetch_html(url: str, timeout: int = 10, max_retries: int = 2, backoff: float
                 status = e.response.status_code if e.response is not None else None
             except Exception:
                 status = None
-            print(f"Confluence REST API request failed: {api_url} status={status} error={e}")
+            logger.warning("Confluence REST API request failed: %s status=%s error=%s", api_url, status, e)
             return None
         except Exception as e:
-            print(f"Confluence REST API parsing failed: {e}")
+            logger.warning("Confluence REST API parsing failed: %s", e)
             return None
 
     # If the caller passed a REST API URL already, try to extract the stored HTML
@@ -112,7 +185,7 @@ def fetch_html(url: str, timeout: int = 10, max_retries: int = 2, backoff: float
         try:
             headers_rest = headers.copy()
             headers_rest["Accept"] = "application/json"
-            resp = requests.get(url, headers=headers_rest, timeout=timeout, auth=auth)
+            resp = session.get(url, headers=headers_rest, timeout=timeout, auth=auth)
             resp.raise_for_status()
             try:
                 data = resp.json()
@@ -130,39 +203,33 @@ def fetch_html(url: str, timeout: int = 10, max_retries: int = 2, backoff: float
                 return resp.text
         except RequestException:
             try:
-                print(f"Confluence API request failed: status={resp.status_code} url={url}")
+                logger.warning("Confluence API request failed: status=%s url=%s", resp.status_code, url)
             except Exception:
                 pass
             return None
 
     # For normal page URLs, respect robots.txt. Skip robots for API endpoints already handled.
-    rc = RobotsChecker(user_agent=headers["User-Agent"])
-    if not rc.allowed(url):
+    if not _robots.allowed(url):
         return None
 
-    attempt = 0
-    while attempt <= max_retries:
-        try:
-            resp = requests.get(url, headers=headers, timeout=timeout, auth=auth)
-            resp.raise_for_status()
-            text = resp.text
-            # Prefer REST API for Atlassian Cloud hosts when auth is available
-            # (regular page URLs often return client-side JS placeholders or login HTML)
-            if parsed.netloc.endswith("atlassian.net") and (bearer or auth):
-                api_html = _try_confluence_rest_api()
-                if api_html:
-                    return api_html
-            # If Confluence returned the JS-disabled placeholder, and we have auth, also try REST API
-            if ("Atlassian JavaScript is disabled" in text or "Atlassian JavaScript load error" in text) and (bearer or auth):
-                api_html = _try_confluence_rest_api()
-                if api_html:
-                    return api_html
-            return text
-        except RequestException:
-            attempt += 1
-            if attempt > max_retries:
-                return None
-            time.sleep(backoff * attempt)
+    try:
+        resp = session.get(url, headers=headers, timeout=timeout, auth=auth)
+        resp.raise_for_status()
+    except RequestException:
+        return None
+    text = resp.text
+    # Prefer REST API for Atlassian Cloud hosts when auth is available
+    # (regular page URLs often return client-side JS placeholders or login HTML)
+    if parsed.netloc.endswith("atlassian.net") and (bearer or auth):
+        api_html = _try_confluence_rest_api()
+        if api_html:
+            return api_html
+    # If Confluence returned the JS-disabled placeholder, and we have auth, also try REST API
+    if ("Atlassian JavaScript is disabled" in text or "Atlassian JavaScript load error" in text) and (bearer or auth):
+        api_html = _try_confluence_rest_api()
+        if api_html:
+            return api_html
+    return text
 
 
 def fetch_all_content(url: str, timeout: int = 10, max_retries: int = 2) -> Optional[Dict[str, object]]:
@@ -172,6 +239,7 @@ def fetch_all_content(url: str, timeout: int = 10, max_retries: int = 2) -> Opti
       - "html": str HTML text
       - "resources": dict mapping absolute URL -> bytes
       - "failed": list of resource URLs that failed to download
+      - "soup": the parsed HTML, for parse_html(..., soup=...)
 
     Returns None if the main HTML could not be fetched.
     """
@@ -179,22 +247,18 @@ def fetch_all_content(url: str, timeout: int = 10, max_retries: int = 2) -> Opti
     if html is None:
         return None
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, HTML_PARSER)
     parsed_page = urllib.parse.urlparse(url)
     base = f"{parsed_page.scheme}://{parsed_page.netloc}"
 
     # Gather resource references
+    # One walk over the tree for images, stylesheets and scripts
     resource_urls: List[str] = []
-    for img in soup.find_all("img"):
-        src = img.get("src")
-        if src:
-            resource_urls.append(src)
-    for link in soup.find_all("link", rel=lambda x: x and "stylesheet" in x):
-        href = link.get("href")
-        if href:
-            resource_urls.append(href)
-    for script in soup.find_all("script"):
-        src = script.get("src")
+    for tag in soup.find_all(["img", "link", "script"]):
+        if tag.name == "link":
+            src = tag.get("href") if "stylesheet" in (tag.get("rel") or []) else None
+        else:
+            src = tag.get("src")
         if src:
             resource_urls.append(src)
 
@@ -232,18 +296,36 @@ def fetch_all_content(url: str, timeout: int = 10, max_retries: int = 2) -> Opti
                 elif auth_user and auth_token:
                     download_auth = HTTPBasicAuth(auth_user, auth_token)
             
-            resp = requests.get(res_url, headers=download_headers, auth=download_auth, timeout=timeout)
-            resp.raise_for_status()
-            content = resp.content
+            # Stream so an oversized or media resource is dropped without
+            # reading its body into memory
+            with http_session().get(
+                res_url, headers=download_headers, auth=download_auth, timeout=timeout, stream=True
+            ) as resp:
+                resp.raise_for_status()
+                content_type = resp.headers.get('content-type', '')
+                if content_type.startswith(_SKIPPED_RESOURCE_TYPES):
+                    logger.info("Skipping resource %s of type %s", res_url, content_type)
+                    return res_url, None
+                if int(resp.headers.get('content-length') or 0) > MAX_RESOURCE_BYTES:
+                    logger.info("Skipping resource %s: Content-Length over %d bytes", res_url, MAX_RESOURCE_BYTES)
+                    return res_url, None
+                buf = bytearray()
+                for chunk in resp.iter_content(64 * 1024):
+                    buf.extend(chunk)
+                    if len(buf) > MAX_RESOURCE_BYTES:
+                        logger.info("Skipping resource %s: body over %d bytes", res_url, MAX_RESOURCE_BYTES)
+                        return res_url, None
+            content = bytes(buf)
             # Debug: log what we downloaded to help diagnose issues
-            content_type = resp.headers.get('content-type', '')
             if len(content) < 10000 and ('text/html' in content_type or 'application/json' in content_type):
                 # Likely an error page, not actual resource - log it
-                print(f"WARNING: Resource {res_url} returned {content_type} ({len(content)} bytes)")
-                print(f"  First 200 chars: {content[:200]}")
+                logger.warning(
+                    "Resource %s returned %s (%d bytes); first 200 chars: %r",
+                    res_url, content_type, len(content), content[:200],
+                )
             return res_url, content
         except Exception as e:
-            print(f"Failed to download resource {res_url}: {e}")
+            logger.warning("Failed to download resource %s: %s", res_url, e)
             return res_url, None
 
     with ThreadPoolExecutor(max_workers=6) as ex:
@@ -259,5 +341,5 @@ def fetch_all_content(url: str, timeout: int = 10, max_retries: int = 2) -> Opti
             except Exception:
                 failed.append(u)
 
-    return {"html": html, "resources": resources, "failed": failed}
+    return {"html": html, "resources": resources, "failed": failed, "soup": soup}
 
@@ -4,6 +4,12 @@ from typing import Optional, Dict, List, Any
 
 from bs4 import BeautifulSoup
 
+try:
+    import lxml  # noqa: F401  # optional C parser, much faster than html.parser
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
 
 def extract_media_and_references(soup: BeautifulSoup, base_url: str) -> Dict[str, Any]:
     """Extract images, videos, and references from parsed HTML.
@@ -13,100 +19,115 @@ def extract_media_and_references(soup: BeautifulSoup, base_url: str) -> Dict[str
     - videos: list of video objects with src, poster, etc.
     - references: list of link objects with href, text, title, etc.
     """
+    urljoin = urllib.parse.urljoin
+
     def resolve_url(url: str) -> str:
         """Resolve relative URLs to absolute URLs."""
-        if not url:
+        # Absolute URLs (the common case for CDN-hosted media) skip urljoin's two parses
+        if not url or url.startswith(("http://", "https://")):
             return url
-        return urllib.parse.urljoin(base_url, url)
-    
-    # Extract images
-    images = []
-    for img in soup.find_all("img"):
-        src = img.get("src")
-        if src:
-            image_data = {
-                "src": resolve_url(src),
-                "alt": img.get("alt", ""),
-                "title": img.get("title", ""),
-                "width": img.get("width"),
-                "height": img.get("height"),
-                "class": img.get("class", []) if img.get("class") else []
-            }
-            # Remove None values
-            image_data = {k: v for k, v in image_data.items() if v is not None and v != ""}
-            images.append(image_data)
+        return urljoin(base_url, url)
     
-    # Extract videos
+    # Keyed by resolved URL so repeats (logos, nav links, ...) are kept once,
+    # in first-seen order
+    images = {}
     videos = []
-    for video in soup.find_all("video"):
-        video_sources = []
-        src = video.get("src")
-        if src:
-            video_sources.append({"src": resolve_url(src), "type": video.get("type", "")})
-        
-        # Check for source elements
-        for source in video.find_all("source"):
-            src = source.get("src")
+    references = {}
+    embedded = {}
+    # One walk over the tree; each tag is routed to its list below
+    for tag in soup.find_all(["img", "video", "a", "iframe"]):
+        name = tag.name
+        if name == "img":
+            src = tag.get("src")
             if src:
-                video_sources.append({"src": resolve_url(src), "type": source.get("type", "")})
-        
-        if video_sources:
-            video_data = {
-                "sources": video_sources,
-                "poster": resolve_url(video.get("poster", "")),
-                "controls": video.has_attr("controls"),
-                "autoplay": video.has_attr("autoplay"),
-                "loop": video.has_attr("loop"),
-                "width": video.get("width"),
-                "height": video.get("height")
-            }
-            # Remove empty values
-            video_data = {k: v for k, v in video_data.items() if v is not None and v != ""}
-            videos.append(video_data)
-    
-    # Extract references (links)
-    references = []
-    for link in soup.find_all("a"):
-        href = link.get("href")
-        if href and not href.startswith("#"):  # Skip anchor links
-            link_text = link.get_text(strip=True)
-            if link_text:  # Only include links with text
-                reference_data = {
-                    "href": resolve_url(href),
-                    "text": link_text,
-                    "title": link.get("title", ""),
-                    "target": link.get("target", ""),
-                    "rel": link.get("rel", []) if link.get("rel") else []
+                src = resolve_url(src)
+                if src in images:
+                    continue
+                image_data = {
+                    "src": src,
+                    "alt": tag.get("alt", ""),
+                    "title": tag.get("title", ""),
+                    "width": tag.get("width"),
+                    "height": tag.get("height"),
+                    "class": tag.get("class", []) if tag.get("class") else []
+                }
+                # Remove None values
+                image_data = {k: v for k, v in image_data.items() if v is not None and v != ""}
+                images[src] = image_data
+
+        elif name == "video":
+            video_sources = []
+            src = tag.get("src")
+            if src:
+                video_sources.append({"src": resolve_url(src), "type": tag.get("type", "")})
+
+            # Check for source elements
+            for source in tag.find_all("source"):
+                src = source.get("src")
+                if src:
+                    video_sources.append({"src": resolve_url(src), "type": source.get("type", "")})
+
+            if video_sources:
+                video_data = {
+                    "sources": video_sources,
+                    "poster": resolve_url(tag.get("poster", "")),
+                    "controls": tag.has_attr("controls"),
+                    "autoplay": tag.has_attr("autoplay"),
+                    "loop": tag.has_attr("loop"),
+                    "width": tag.get("width"),
+                    "height": tag.get("height")
                 }
                 # Remove empty values
-                reference_data = {k: v for k, v in reference_data.items() if v is not None and v != ""}
-                references.append(reference_data)
-    
-    # Also extract embedded content (iframes)
-    embedded = []
-    for iframe in soup.find_all("iframe"):
-        src = iframe.get("src")
-        if src:
-            embedded_data = {
-                "src": resolve_url(src),
-                "title": iframe.get("title", ""),
-                "width": iframe.get("width"),
-                "height": iframe.get("height"),
-                "type": "iframe"
-            }
-            # Remove empty values
-            embedded_data = {k: v for k, v in embedded_data.items() if v is not None and v != ""}
-            embedded.append(embedded_data)
-    
+                video_data = {k: v for k, v in video_data.items() if v is not None and v != ""}
+                videos.append(video_data)
+
+        elif name == "a":
+            # References (links)
+            href = tag.get("href")
+            if href and not href.startswith("#"):  # Skip anchor links
+                href = resolve_url(href)
+                if href in references:
+                    continue
+                link_text = tag.get_text(strip=True)
+                if link_text:  # Only include links with text
+                    reference_data = {
+                        "href": href,
+                        "text": link_text,
+                        "title": tag.get("title", ""),
+                        "target": tag.get("target", ""),
+                        "rel": tag.get("rel", []) if tag.get("rel") else []
+                    }
+                    # Remove empty values
+                    reference_data = {k: v for k, v in reference_data.items() if v is not None and v != ""}
+                    references[href] = reference_data
+
+        else:
+            # Embedded content (iframes)
+            src = tag.get("src")
+            if src:
+                src = resolve_url(src)
+                if src in embedded:
+                    continue
+                embedded_data = {
+                    "src": src,
+                    "title": tag.get("title", ""),
+                    "width": tag.get("width"),
+                    "height": tag.get("height"),
+                    "type": "iframe"
+                }
+                # Remove empty values
+                embedded_data = {k: v for k, v in embedded_data.items() if v is not None and v != ""}
+                embedded[src] = embedded_data
+
     return {
-        "images": images,
+        "images": list(images.values()),
         "videos": videos,
-        "references": references,
-        "embedded": embedded
+        "references": list(references.values()),
+        "embedded": list(embedded.values())
     }
 
 
-def parse_html(html: str, max_snippet_chars: Optional[int] = None, full_text: bool = False, extract_resources: bool = True, base_url: str = "") -> dict:
+def parse_html(html: str, max_snippet_chars: Optional[int] = None, full_text: bool = False, extract_resources: bool = True, base_url: str = "", soup: Optional[BeautifulSoup] = None) -> dict:
     """Parse HTML and return a dict with text content and optional media resources.
 
     Parameters
@@ -118,6 +139,8 @@ def parse_html(html: str, max_snippet_chars: Optional[int] = None, full_text: bo
     - full_text: if True, return full text instead of snippet
     - extract_resources: if True, extract images, videos, and references
     - base_url: base URL for resolving relative URLs in resources
+    - soup: an already parsed tree of `html` (e.g. from fetch_all_content),
+      so the page isn't parsed twice
     """
     # Resolve max length: explicit param -> env var -> default 400
     if max_snippet_chars is None:
@@ -127,7 +150,8 @@ def parse_html(html: str, max_snippet_chars: Optional[int] = None, full_text: bo
         except Exception:
             max_snippet_chars = 400
     
-    soup = BeautifulSoup(html, "html.parser")
+    if soup is None:
+        soup = BeautifulSoup(html, HTML_PARSER)
     # Prefer the head <title> tag when present. If it's missing or empty,
     # fall back to common article header used by some sites (e.g. Confluence)
     # which places the title in an <h1 id="heading-title-text">.
@@ -157,19 +181,22 @@ def parse_html(html: str, max_snippet_chars: Optional[int] = None, full_text: bo
             title = first_h1.get_text(strip=True)
 
     # Extract visible text from body and return either the full text or a short snippet
-    body = soup.find("body")
-    if body:
-        text = " ".join(body.stripped_strings)
-    else:
-        text = " ".join(soup.stripped_strings)
-
+    body = soup.find("body") or soup
     result = {"title": title}
-    
+
     if full_text:
-        result["text_snippet"] = text
+        result["text_snippet"] = " ".join(body.stripped_strings)
     else:
-        snippet = text[: max_snippet_chars]
-        result["text_snippet"] = snippet
+        # Stop walking the DOM once the snippet is long enough instead of
+        # joining the whole page's text just to slice off its head
+        parts = []
+        total = 0
+        for s in body.stripped_strings:
+            parts.append(s)
+            total += len(s) + 1
+            if total >= max_snippet_chars:
+                break
+        result["text_snippet"] = " ".join(parts)[: max_snippet_chars]
 
     # Extract media and references if requested
     if extract_resources and base_url:
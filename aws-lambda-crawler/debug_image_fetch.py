@@ -6,7 +6,9 @@ This suggests the fetcher is downloading HTML error pages instead of actual imag
 import sys
 import os
 import hashlib
-from urllib.parse import urlparse, urljoin
+import re
+from functools import lru_cache
+from urllib.parse import urlsplit, urljoin
 
 # Add current directory to path so we can import crawler modules
 sys.path.insert(0, '/Users/dung.ho/Documents/Training/Python/BytescribeTeam/aws-lambda-crawler')
@@ -14,6 +16,20 @@ sys.path.insert(0, '/Users/dung.ho/Documents/Training/Python/BytescribeTeam/aws-
 from crawler.fetcher import fetch_all_content
 from crawler.parser import parse_html
 
+# Resource URLs are split more than once below; only the netloc is needed
+_urlsplit = lru_cache(maxsize=4096)(urlsplit)
+# Image extensions anywhere in the URL, case-insensitive; the summary's
+# count leaves SVGs out
+_IMAGE_URL_RE = re.compile(r"\.(?:jpe?g|png|gif|webp|svg)", re.IGNORECASE)
+_RASTER_IMAGE_URL_RE = re.compile(r"\.(?:jpe?g|png|gif|webp)", re.IGNORECASE)
+# Leading bytes of the image formats this script recognizes
+_IMAGE_SIGNATURES = (
+    (b'\xff\xd8', 'JPEG'),
+    (b'\x89PNG\r\n\x1a\n', 'PNG'),
+    (b'GIF87a', 'GIF'),
+    (b'GIF89a', 'GIF'),
+)
+
 def debug_image_fetching(url):
     """Debug what's actually being fetched for images."""
     print("="*70)
@@ -61,12 +77,12 @@ def debug_image_fetching(url):
     
     # 3. Analyze downloaded resources
     print("\n3. Analyzing downloaded resources...")
-    base_domain = urlparse(url).netloc
+    base_domain = _urlsplit(url).netloc
     
     for res_url, data in resources.items():
         # Check if this looks like an image URL
-        is_image_url = any(ext in res_url.lower() for ext in ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg'])
-        res_domain = urlparse(res_url).netloc
+        is_image_url = bool(_IMAGE_URL_RE.search(res_url))
+        res_domain = _urlsplit(res_url).netloc
         
         print(f"\nResource: {res_url}")
         print(f"  Domain: {res_domain} (same as base: {res_domain == base_domain})")
@@ -76,8 +92,11 @@ def debug_image_fetching(url):
         
         # Try to detect what this actually is
         if len(data) > 0:
-            # Check for HTML
-            try:
+            label = next((name for sig, name in _IMAGE_SIGNATURES if data.startswith(sig)), None)
+            if label:
+                print(f"  ✓ Valid {label} image")
+            else:
+                # Only non-images get decoded, to check for HTML/JSON error pages
                 text_start = data[:200].decode('utf-8', errors='ignore').strip()
                 if text_start.startswith('<!DOCTYPE') or text_start.startswith('<html'):
                     print(f"  ⚠ WARNING: This is HTML, not an image!")
@@ -85,16 +104,8 @@ def debug_image_fetching(url):
                 elif text_start.startswith('{"') or text_start.startswith('['):
                     print(f"  ⚠ WARNING: This is JSON, not an image!")
                     print(f"    Content preview: {text_start[:100]}...")
-                elif data[:2] == b'\xff\xd8':
-                    print(f"  ✓ Valid JPEG image")
-                elif data[:8] == b'\x89PNG\r\n\x1a\n':
-                    print(f"  ✓ Valid PNG image")
-                elif data[:6] in (b'GIF87a', b'GIF89a'):
-                    print(f"  ✓ Valid GIF image")
                 else:
                     print(f"  ? Unknown file type")
-            except:
-                print(f"  ? Binary data (cannot decode as text)")
         
         # If this is supposed to be an image but has suspicious size/content
         if is_image_url and len(data) == 4303:
@@ -111,14 +122,14 @@ def debug_image_fetching(url):
     print("SUMMARY & RECOMMENDATIONS")
     print("="*70)
     
-    image_resources = [url for url in resources.keys() if any(ext in url.lower() for ext in ['.jpg', '.jpeg', '.png', '.gif', '.webp'])]
+    image_resources = [url for url in resources.keys() if _RASTER_IMAGE_URL_RE.search(url)]
     same_size_count = sum(1 for data in resources.values() if len(data) == 4303)
     
     if same_size_count > 1:
         print(f"🚨 PROBLEM: {same_size_count} resources have identical size (4303 bytes)")
         print("   This suggests they're all the same content (likely error pages)")
         
-    if any(urlparse(url).netloc.endswith('.atlassian.net') for url in image_resources):
+    if any(_urlsplit(url).netloc.endswith('.atlassian.net') for url in image_resources):
         print("\n💡 CONFLUENCE DETECTED:")
         print("   - Make sure CONFLUENCE_USER and CONFLUENCE_API_TOKEN are set")
         print("   - Or set up AWS Secrets Manager with Confluence credentials")
@@ -1,24 +1,81 @@
 import json
+import logging
+
+# Configured here, at the entry point, rather than by the modules it imports.
+# Lambda already installs a handler on the root logger; only set the level
+logging.getLogger().setLevel(logging.INFO)
 
 from crawler.fetcher import fetch_html, fetch_all_content
 from crawler.parser import parse_html
 import traceback
+from functools import lru_cache
 
 # Import Bedrock helper functions from the local app module
 try:
-    from app.utils.bedrock.bedrock_runtime import summarize_and_select_images, summarize_page
+    from app.utils.bedrock.bedrock_runtime import summarize_and_select_images, summarize_page, get_client
+    # Build the Bedrock client during Lambda init so warm invocations reuse it
+    get_client()
 except Exception as e:
     print(f"Warning: Could not import bedrock helpers: {e}")
     summarize_and_select_images = None
     summarize_page = None
 import os
 import hashlib
+import threading
 import boto3
 import mimetypes
 from urllib.parse import urlparse, unquote
 from botocore.exceptions import ClientError
 from botocore.config import Config as BotoConfig
 
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def _s3_client(region=None):
+    """
+    S3 client with SigV4 signing and the current region, so presigned URLs
+    use the regional endpoint. Cached so warm invocations reuse its
+    keep-alive connections instead of paying a new TLS handshake.
+    """
+    config = BotoConfig(
+        signature_version="s3v4",
+        region_name=region,
+        max_pool_connections=32,
+        retries={"max_attempts": 3, "mode": "adaptive"},
+        connect_timeout=3,
+        read_timeout=60,
+        tcp_keepalive=True,
+    )
+    return boto3.client("s3", config=config)
+
+
+@lru_cache(maxsize=None)
+def _lambda_client(region=None):
+    """Lambda client for the async job hand-off, cached like `_s3_client`."""
+    return boto3.client("lambda", region_name=region)
+
+
+def _warm_s3():
+    """Open the S3 client's connection during init (in the background) so the
+    first upload skips the TLS handshake. HeadBucket is a cheap, valid call."""
+    bucket = os.getenv("S3_UPLOAD_BUCKET") or os.getenv("BUCKET_NAME")
+    if not (bucket and os.getenv("AWS_LAMBDA_FUNCTION_NAME")):
+        return
+    if os.getenv("AWS_LAMBDA_INITIALIZATION_TYPE") == "snap-start":
+        return
+
+    def _head():
+        try:
+            _s3_client(os.getenv("REGION") or os.getenv("AWS_DEFAULT_REGION")).head_bucket(Bucket=bucket)
+        except Exception:
+            pass
+
+    threading.Thread(target=_head, daemon=True).start()
+
+
+_warm_s3()
+
 
 def _cors_headers():
     return {
@@ -29,10 +86,15 @@ def _cors_headers():
 
 
 def _proxy_response(status_code: int, payload: dict):
+    return _proxy_json_response(status_code, json.dumps(payload))
+
+
+def _proxy_json_response(status_code: int, body: str):
+    """Proxy response for a body that is already serialized JSON."""
     return {
         "statusCode": status_code,
         "headers": _cors_headers(),
-        "body": json.dumps(payload),
+        "body": body,
     }
 
 
@@ -87,8 +149,7 @@ def _process_async_job(event, context):
         
         # Update job status
         region = os.getenv("REGION") or os.getenv("AWS_DEFAULT_REGION")
-        s3_config = BotoConfig(signature_version="s3v4", region_name=region) if region else BotoConfig(signature_version="s3v4")
-        s3_client = boto3.client("s3", config=s3_config)
+        s3_client = _s3_client(region)
         
         def update_job_status(status, progress=None, result=None, error=None):
             job_update = {
@@ -199,16 +260,15 @@ def lambda_handler(event, context=None):
                 if not job_id:
                     return _proxy_response(400, {"error": "missing job_id"})
                 region = os.getenv("REGION") or os.getenv("AWS_DEFAULT_REGION")
-                s3_config = BotoConfig(signature_version="s3v4", region_name=region) if region else BotoConfig(signature_version="s3v4")
-                s3_client = boto3.client("s3", config=s3_config)
+                s3_client = _s3_client(region)
                 s3_bucket = os.getenv("S3_UPLOAD_BUCKET") or os.getenv("BUCKET_NAME")
                 if not s3_bucket:
                     return _proxy_response(500, {"error": "S3 upload bucket not configured"})
                 try:
                     job_key = f"jobs/{job_id}.json"
                     result = s3_client.get_object(Bucket=s3_bucket, Key=job_key)
-                    job_data = json.loads(result["Body"].read())
-                    return _proxy_response(200, job_data)
+                    # Stored as JSON already; no need to parse and re-serialize it
+                    return _proxy_json_response(200, result["Body"].read().decode("utf-8"))
                 except ClientError as e:
                     if e.response['Error']['Code'] == 'NoSuchKey':
                         return _proxy_response(404, {"error": "job not found", "job_id": job_id})
@@ -295,12 +355,14 @@ def lambda_handler(event, context=None):
                 event.get("full") or event.get("full_content") or event.get("full_text")
             )
 
+    soup = None
     try:
         if want_full:
             fetched = fetch_all_content(url)
             if fetched is None:
                 return _proxy_response(502, {"error": "failed to fetch url (full)", "url": url})
             html = fetched.get("html")
+            soup = fetched.get("soup")
         else:
             html = fetch_html(url)
     except Exception as exc:
@@ -328,7 +390,9 @@ def lambda_handler(event, context=None):
             max_snippet_chars=parse_max, 
             full_text=want_full,
             extract_resources=extract_resources,
-            base_url=url
+            base_url=url,
+            # fetch_all_content already parsed the page to find its resources
+            soup=soup,
         )
     except Exception as exc:
         return _proxy_response(500, {"error": "failed to parse html", "detail": str(exc)})
@@ -348,11 +412,11 @@ def lambda_handler(event, context=None):
         
         # Check job status in S3
         try:
-            s3_client = boto3.client("s3", config=s3_config)
+            s3_client = _s3_client(os.getenv("REGION") or os.getenv("AWS_DEFAULT_REGION"))
             job_key = f"jobs/{job_id}.json"
             result = s3_client.get_object(Bucket=s3_bucket, Key=job_key)
-            job_data = json.loads(result["Body"].read())
-            return _proxy_response(200, job_data)
+            # Stored as JSON already; no need to parse and re-serialize it
+            return _proxy_json_response(200, result["Body"].read().decode("utf-8"))
         except ClientError as e:
             if e.response['Error']['Code'] == 'NoSuchKey':
                 return _proxy_response(404, {"error": "job not found", "job_id": job_id})
@@ -386,12 +450,8 @@ def lambda_handler(event, context=None):
                 s3_prefix = os.getenv("S3_UPLOAD_PREFIX", "")
 
                 # Helper to upload bytes to S3 and return an https URL
-                # Create the S3 client with explicit SigV4 signing and the
-                # current region so generated presigned URLs include the
-                # correct regional endpoint / signature format.
                 region = os.getenv("REGION") or os.getenv("AWS_DEFAULT_REGION")
-                s3_config = BotoConfig(signature_version="s3v4", region_name=region) if region else BotoConfig(signature_version="s3v4")
-                s3_client = boto3.client("s3", config=s3_config)
+                s3_client = _s3_client(region)
 
                 def _upload_to_s3(key: str, data: bytes, content_type: str = None):
                     """Upload bytes to S3 and return a dict with upload_key and presigned_url (or None on failure)."""
@@ -546,12 +606,13 @@ def lambda_handler(event, context=None):
             # Expose the images_json in the immediate response payload so
             # clients (and tests) can see what was sent to the captioning
             # routine. Also log it to CloudWatch for troubleshooting.
-            try:
-                response_payload["images_json"] = images_json
-                print(f"DEBUG images_json (first 3): {json.dumps(images_json[:3], ensure_ascii=False)}")
-            except Exception:
-                # If serialization fails for any reason, keep going silently
-                print("DEBUG: failed to serialize images_json for log")
+            response_payload["images_json"] = images_json
+            if logger.isEnabledFor(logging.DEBUG):
+                try:
+                    logger.debug("images_json (first 3): %s", json.dumps(images_json[:3], ensure_ascii=False))
+                except Exception:
+                    # If serialization fails for any reason, keep going silently
+                    logger.debug("failed to serialize images_json for log")
 
             # If async mode requested, start background job and return immediately
             if async_mode:
@@ -578,7 +639,7 @@ def lambda_handler(event, context=None):
                     )
                     
                     # Invoke another Lambda asynchronously to process the job
-                    lambda_client = boto3.client("lambda", region_name=region)
+                    lambda_client = _lambda_client(region)
                     async_payload = {
                         "job_id": job_id,
                         "content_to_summary": content_to_summary,
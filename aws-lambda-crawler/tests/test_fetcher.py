@@ -0,0 +1,51 @@
+import os
+from unittest.mock import MagicMock, patch
+
+from requests.exceptions import ConnectionError
+
+from crawler import fetcher
+
+
+def _checker(monkeypatch, tmp_path, **response):
+    monkeypatch.setattr(fetcher, "_ROBOTS_CACHE_DIR", str(tmp_path))
+    session = MagicMock()
+    if "error" in response:
+        session.get.side_effect = response["error"]
+    else:
+        resp = MagicMock(status_code=response["status"], ok=response["status"] < 400, text=response.get("text", ""))
+        session.get.return_value = resp
+    return fetcher.RobotsChecker(), session
+
+
+def test_robots_server_error_disallows_and_is_not_cached(monkeypatch, tmp_path):
+    checker, session = _checker(monkeypatch, tmp_path, status=503)
+    with patch.object(fetcher, "http_session", return_value=session):
+        assert not checker.allowed("https://example.com/page")
+        assert not checker.allowed("https://example.com/other")
+    assert session.get.call_count == 1
+    assert os.listdir(tmp_path) == []
+    expires = checker._parsers["https://example.com"][1]
+    assert expires - fetcher.time.monotonic() <= fetcher._ROBOTS_RETRY_TTL
+
+
+def test_robots_missing_allows_everything(monkeypatch, tmp_path):
+    checker, session = _checker(monkeypatch, tmp_path, status=404)
+    with patch.object(fetcher, "http_session", return_value=session):
+        assert checker.allowed("https://example.com/page")
+
+
+def test_robots_network_error_allows_but_is_retried_soon(monkeypatch, tmp_path):
+    checker, session = _checker(monkeypatch, tmp_path, error=ConnectionError("down"))
+    with patch.object(fetcher, "http_session", return_value=session):
+        assert checker.allowed("https://example.com/page")
+    expires = checker._parsers["https://example.com"][1]
+    assert expires - fetcher.time.monotonic() <= fetcher._ROBOTS_RETRY_TTL
+
+
+def test_robots_rules_are_applied_and_cached(monkeypatch, tmp_path):
+    checker, session = _checker(monkeypatch, tmp_path, status=200, text="User-agent: *\nDisallow: /private")
+    with patch.object(fetcher, "http_session", return_value=session):
+        assert checker.allowed("https://example.com/page")
+        assert not checker.allowed("https://example.com/private/x")
+    assert session.get.call_count == 1
+    assert len(os.listdir(tmp_path)) == 1
@@ -0,0 +1,58 @@
+import asyncio
+from unittest.mock import patch
+
+from app.utils.bedrock import gen_captions
+
+
+def test_batch_captions_group_images_and_fall_back_for_missing_lines():
+    gen_captions._caption_cache.clear()
+    batches = []
+
+    def fake_batch(images, mode="caption"):
+        batches.append(len(images))
+        # The reply skips the last image of the batch
+        return {i: f"{mode} {data.decode()}" for i, (data, _) in enumerate(images[:-1], 1)}
+
+    with patch.object(gen_captions, "s3_image_to_bytes_and_type", side_effect=lambda uri: (uri.encode(), "image/png")), \
+            patch.object(gen_captions, "claude_caption_batch", side_effect=fake_batch), \
+            patch.object(gen_captions, "claude_caption_single", return_value="single"), \
+            patch.object(gen_captions, "CAPTION_BATCH_SIZE", 3):
+        results = gen_captions.batch_multi_mode_s3_images(["a", "b", "c", "a"], ("caption",))
+
+    texts = [r["result"] for r in results["caption"]]
+    assert batches == [3]
+    assert texts[0] == texts[3]
+    assert texts[:3].count("single") == 1
+    assert all(t in ("single", f"caption {uri}") for uri, t in zip("abca", texts))
+
+
+def test_batch_captions_identical_images_once():
+    gen_captions._caption_cache.clear()
+    captioned = []
+
+    def fake_single(data, media_type, mode="caption"):
+        captioned.append(data)
+        return f"{mode} {data.decode()}"
+
+    images = {"s3://b/a.png": b"same", "s3://b/copy.png": b"same", "s3://b/c.png": b"other"}
+    with patch.object(gen_captions, "s3_image_to_bytes_and_type", side_effect=lambda uri: (images[uri], "image/png")), \
+            patch.object(gen_captions, "claude_caption_single", side_effect=fake_single), \
+            patch.object(gen_captions, "CAPTION_BATCH_SIZE", 1):
+        first = gen_captions.batch_multi_mode_s3_images(list(images), ("caption",))["caption"]
+        # A later batch reuses the cached text without calling the model
+        again = gen_captions.batch_multi_mode_s3_images(["s3://b/copy.png"], ("caption",))["caption"]
+
+    assert sorted(captioned) == [b"other", b"same"]
+    assert [r["result"] for r in first] == ["caption same", "caption same", "caption other"]
+    assert [r["s3_uri"] for r in first] == list(images)
+    assert again == [{"s3_uri": "s3://b/copy.png", "result": "caption same", "mode": "caption"}]
+
+
+def test_batch_caption_async_matches_sync():
+    gen_captions._caption_cache.clear()
+    with patch.object(gen_captions, "s3_image_to_bytes_and_type", side_effect=lambda uri: (uri.encode(), "image/png")), \
+            patch.object(gen_captions, "claude_caption_single", side_effect=lambda data, media_type, mode: data.decode()), \
+            patch.object(gen_captions, "CAPTION_BATCH_SIZE", 1):
+        results = asyncio.run(gen_captions.batch_caption_s3_images_async(["a", "b"], mode="title"))
+
+    assert [(r["s3_uri"], r["result"], r["mode"]) for r in results] == [("a", "a", "title"), ("b", "b", "title")]
@@ -0,0 +1,26 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Lambda installs a root handler before importing the function module;
+# INFO records (e.g. batch-caption completion counts) must still get through
+_SCRIPT = """
+import logging
+logging.getLogger().addHandler(logging.NullHandler())
+import handler
+from app.utils.bedrock import gen_captions
+print(gen_captions.logger.isEnabledFor(logging.INFO))
+"""
+
+
+def test_info_logs_enabled_under_lambda_root_handler():
+    out = subprocess.run(
+        [sys.executable, "-c", _SCRIPT],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert out.stdout.strip().splitlines()[-1] == "True"
@@ -26,6 +26,8 @@ def test_s3_upload_failure_does_not_break_summary():
         msumm.return_value = {"result": {}}
 
         os.environ["S3_UPLOAD_BUCKET"] = "my-bucket"
+        # The S3 client is cached per region; make sure the mocked one is used
+        handler_module._s3_client.cache_clear()
         event = {"url": "https://example.com/page", "full": True}
         resp = handler_module.lambda_handler(event)
         assert resp["statusCode"] == 200
@@ -19,3 +19,17 @@ def test_parse_html_full_text():
     html = f"<html><head><title>Hi</title></head><body><p>{body_text}</p></body></html>"
     out = parse_html(html, full_text=True)
     assert out["text_snippet"] == body_text
+
+
+def test_parse_html_dedupes_resources():
+    html = (
+        "<html><body>"
+        '<img src="/logo.png" alt="Logo"><img src="https://example.com/logo.png">'
+        '<a href="/about">About</a><a href="/about">About us</a>'
+        '<iframe src="https://player.example/1"></iframe><iframe src="https://player.example/1"></iframe>'
+        "</body></html>"
+    )
+    out = parse_html(html, base_url="https://example.com/")
+    assert out["images"] == [{"src": "https://example.com/logo.png", "alt": "Logo", "class": []}]
+    assert [r["text"] for r in out["references"]] == ["About"]
+    assert len(out["embedded"]) == 1
@@ -0,0 +1,37 @@
+import math
+from array import array
+from unittest.mock import patch
+
+from app.utils.bedrock import semantic_cache
+
+
+def _unit(*values):
+    norm = math.sqrt(sum(v * v for v in values))
+    return array("f", [v / norm for v in values])
+
+
+def test_lookup_hits_near_duplicates_only(tmp_path, monkeypatch):
+    monkeypatch.setattr(semantic_cache, "_CACHE_PATH", str(tmp_path / "cache.sqlite3"))
+    semantic_cache._get_db.cache_clear()
+    vectors = {
+        "original page": _unit(1.0, 0.0, 0.0),
+        "original page, lightly edited": _unit(1.0, 0.05, 0.0),
+        "unrelated page": _unit(0.0, 1.0, 0.0),
+    }
+    ns = semantic_cache.namespace("model", {"num_bullets": 3})
+
+    with patch.object(semantic_cache, "_embed", side_effect=vectors.__getitem__):
+        result, vec = semantic_cache.lookup(ns, "original page")
+        assert result is None
+        semantic_cache.store(ns, vec, {"result": {"outputText": "- cached"}})
+
+        hit, _ = semantic_cache.lookup(ns, "original page, lightly edited")
+        miss, _ = semantic_cache.lookup(ns, "unrelated page")
+        other_ns, _ = semantic_cache.lookup(
+            semantic_cache.namespace("model", {"num_bullets": 5}), "original page"
+        )
+
+    semantic_cache._get_db.cache_clear()
+    assert hit == {"result": {"outputText": "- cached"}}
+    assert miss is None
+    assert other_ns is None
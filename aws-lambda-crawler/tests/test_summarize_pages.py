@@ -0,0 +1,69 @@
+import asyncio
+from unittest.mock import patch
+
+from botocore.exceptions import ClientError
+
+from app.utils.bedrock import bedrock_runtime
+
+
+def _client_error(code):
+    return ClientError({"Error": {"Code": code, "Message": code}}, "InvokeModel")
+
+
+def test_summarize_pages_keeps_order_and_returns_exceptions():
+    def fake_summarize(content_page="", **kwargs):
+        if content_page == "bad":
+            raise _client_error("ValidationException")
+        return {"result": {"outputText": content_page.upper()}}
+
+    with patch.object(bedrock_runtime, "summarize_page", side_effect=fake_summarize):
+        results = asyncio.run(bedrock_runtime.summarize_pages(["a", "bad", "c"], concurrency=2))
+
+    assert results[0]["result"]["outputText"] == "A"
+    assert isinstance(results[1], ClientError)
+    assert results[2]["result"]["outputText"] == "C"
+
+
+def test_summarize_pages_retries_throttling():
+    calls = []
+
+    def fake_summarize(content_page="", **kwargs):
+        calls.append(content_page)
+        if len(calls) < 3:
+            raise _client_error("ThrottlingException")
+        return {"result": {"outputText": "ok"}}
+
+    with patch.object(bedrock_runtime, "summarize_page", side_effect=fake_summarize), \
+            patch.object(bedrock_runtime, "_THROTTLE_BASE_DELAY", 0):
+        results = asyncio.run(bedrock_runtime.summarize_pages(["page"]))
+
+    assert results == [{"result": {"outputText": "ok"}}]
+    assert len(calls) == 3
+
+
+def test_summary_models_reads_access_file_once(monkeypatch):
+    monkeypatch.setattr(bedrock_runtime, "_access_memo", (None, 0.0))
+    model = bedrock_runtime._FALLBACK_MODELS[0]
+    with patch.object(bedrock_runtime, "_read_access_cache", return_value=(model,)) as read:
+        for _ in range(3):
+            assert list(bedrock_runtime._summary_models(model)) == [model]
+    assert read.call_count == 1
+
+
+def test_summary_models_keeps_requested_model(monkeypatch):
+    titan = "amazon.titan-text-express-v1"
+    monkeypatch.setattr(bedrock_runtime, "_access_memo", ((titan,), float("inf")))
+    assert list(bedrock_runtime._summary_models("amazon.nova-pro-v1:0")) == ["amazon.nova-pro-v1:0", titan]
+
+
+def test_select_images_tries_requested_model_first(monkeypatch):
+    monkeypatch.setattr(bedrock_runtime, "_access_memo", (("amazon.titan-text-express-v1",), float("inf")))
+    tried = []
+
+    def fake_converse(model_id, *args, **kwargs):
+        tried.append(model_id)
+        return {"output": {"message": {"content": [{"text": '{"bullets": []}'}]}}}
+
+    with patch.object(bedrock_runtime, "_converse", side_effect=fake_converse):
+        bedrock_runtime.summarize_and_select_images("article", [], model_id="amazon.nova-pro-v1:0")
+    assert tried[0] == "amazon.nova-pro-v1:0"